@@ -1,10 +1,10 @@
-from math import log, sqrt, exp
-from scipy.stats import norm
+# The pricing core only needs NumPy. The market data dependencies (pandas,
+# yfinance) are imported lazily by the interactive real-data path so that
+# importing this module for bs_call / bs_price stays cheap.
+from collections import namedtuple
 from datetime import datetime
+import math
 import numpy as np
-import pandas as pd
-import pandas_datareader.data as web
-import yfinance as yf
 
 # Define the variables
 # S = underlying asset price
@@ -12,39 +12,375 @@ import yfinance as yf
 # T = time to maturity
 # r = risk-free rate
 # sigma = volatility
+#
+# Every pricing function accepts scalars or NumPy arrays for S, K, T, r and
+# sigma and broadcasts them against each other. Scalar inputs give scalar
+# results.
+
+# Standard normal CDF without SciPy, using W. J. Cody's rational Chebyshev
+# approximations (the algorithm behind R's pnorm), accurate to double
+# precision. The lower tail N(-|x|) is evaluated once and both N(x) and
+# N(-x) are derived from it, so neither side loses precision to
+# cancellation.
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+_CODY_A = (2.2352520354606839287, 161.02823106855587881, 1067.6894854603709582,
+           18154.981253343561249, 0.065682337918207449113)
+_CODY_B = (47.20258190468824187, 976.09855173777669322, 10260.932208618978205,
+           45507.789335026729956)
+_CODY_C = (0.39894151208813466764, 8.8831497943883759412, 93.506656132177855979,
+           597.27027639480026226, 2494.5375852903726711, 6848.1904505362823326,
+           11602.651437647350124, 9842.7148383839780218, 1.0765576773720192317e-8)
+_CODY_D = (22.266688044328115691, 235.38790178262499861, 1519.377599407554805,
+           6485.558298266760755, 18615.571640885098091, 34900.952721145977266,
+           38912.003286093271411, 19685.429676859990727)
+_CODY_P = (0.21589853405795699, 0.1274011611602473639, 0.022235277870649807,
+           0.001421619193227893466, 2.9112874951168792e-5, 0.02307344176494017303)
+_CODY_Q = (1.28426009614491121, 0.468238212480865118, 0.0659881378689285515,
+           0.00378239633202758244, 7.29751555083966205e-5)
+
+def _norm_cdf_pair(x):
+    x = np.asarray(x, dtype=float)
+    shape = x.shape
+    x = x.ravel()
+    y = np.abs(x)
+    lower = np.empty_like(x)  # N(-|x|)
+
+    near = y <= 0.67448975
+    far = ~(y <= 5.656854249492380)  # also catches NaN
+    mid = ~(near | far)
+    for region, tail in ((near, _cody_near), (mid, _cody_mid), (far, _cody_far)):
+        if region.all():
+            lower = tail(y)
+        elif region.any():
+            lower[region] = tail(y[region])
+
+    upper = 1.0 - lower
+    positive = x > 0
+    return (np.where(positive, upper, lower).reshape(shape),
+            np.where(positive, lower, upper).reshape(shape))
+
+# |x| <= 0.674: rational approximation of N(x) - 1/2 around zero
+def _cody_near(y):
+    ysq = y * y
+    num = _CODY_A[4] * ysq
+    den = ysq.copy()
+    for a, b in zip(_CODY_A[:3], _CODY_B[:3]):
+        num += a
+        num *= ysq
+        den += b
+        den *= ysq
+    num += _CODY_A[3]
+    den += _CODY_B[3]
+    num *= y
+    num /= den
+    return np.subtract(0.5, num, out=num)
+
+# 0.674 < |x| <= sqrt(32): rational approximation of exp(x^2 / 2) * N(-|x|)
+def _cody_mid(y):
+    num = _CODY_C[8] * y
+    den = y.copy()
+    for c, d in zip(_CODY_C[:7], _CODY_D[:7]):
+        num += c
+        num *= y
+        den += d
+        den *= y
+    num += _CODY_C[7]
+    den += _CODY_D[7]
+    num /= den
+    num *= np.exp(-0.5 * y * y)
+    return num
+
+# |x| > sqrt(32): asymptotic expansion in 1 / x^2. N(-40) underflows to
+# zero, so larger arguments are clipped to keep inf finite. exp(-y^2 / 2)
+# is split at y truncated to a multiple of 1/16 to avoid cancellation in y^2.
+def _cody_far(y):
+    y = np.minimum(y, 40.0)
+    ysq = 1.0 / (y * y)
+    num = _CODY_P[5] * ysq
+    den = ysq.copy()
+    for p, q in zip(_CODY_P[:4], _CODY_Q[:4]):
+        num += p
+        num *= ysq
+        den += q
+        den *= ysq
+    tail = (_INV_SQRT_2PI - ysq * (num + _CODY_P[4]) / (den + _CODY_Q[4])) / y
+    ys = np.trunc(y * 16.0) / 16.0
+    return np.exp(-0.5 * ys * ys) * np.exp(-0.5 * (y - ys) * (y + ys)) * tail
+
+def _norm_cdf(x):
+    return _norm_cdf_pair(x)[0]
 
 # Define the d1 and d2 functions
 
 def d1(S, K, T, r, sigma):
-    return (log(S / K) + (r + sigma ** 2 / 2) * T) / (sigma * sqrt(T))
+    S, K, T, r, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+    return _scalar_or_array((np.log(S / K) + (r + sigma ** 2 / 2) * T) / (sigma * np.sqrt(T)))
 
 def d2(S, K, T, r, sigma):
-    return d1(S, K, T, r, sigma) - sigma * sqrt(T)
+    S, K, T, r, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+    return _scalar_or_array(d1(S, K, T, r, sigma) - sigma * np.sqrt(T))
+
+# Price calls and puts together in one broadcasted pass.
+# The shared terms (log-moneyness, sigma * sqrt(T), the discounted strike)
+# are computed once and every intermediate is written in place, so a chain
+# of N contracts costs a handful of N-sized temporaries. Pass
+# out=(call_buffer, put_buffer) to reuse preallocated float64 arrays of the
+# broadcast shape. Returns (call, put).
+def bs_price(S, K, T, r, sigma, out=None):
+    if out is None and all(_is_scalar(x) for x in (S, K, T, r, sigma)):
+        try:
+            return _bs_price_scalar(float(S), float(K), float(T), float(r), float(sigma))
+        except (ValueError, ZeroDivisionError, OverflowError):
+            pass  # T or sigma of zero, negative prices, ...: the array path's inf / nan handling
+    S, K, T, r, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+    shape = np.broadcast_shapes(S.shape, K.shape, T.shape, r.shape, sigma.shape)
+
+    if out is None:
+        call = np.empty(shape)
+        put = np.empty(shape)
+    else:
+        call, put = out
+        if call.shape != shape or put.shape != shape:
+            raise ValueError(f"out buffers must have shape {shape}")
+        if call.dtype != np.float64 or put.dtype != np.float64:
+            raise ValueError("out buffers must be float64")
+
+    # sigma * sqrt(T), shared by d1 and d2
+    vol_sqrt_t = np.sqrt(T) * sigma
+    vol_sqrt_t = np.broadcast_to(vol_sqrt_t, shape)
+
+    # d1 = (log(S / K) + (r + sigma^2 / 2) * T) / (sigma * sqrt(T)), built in the call buffer
+    np.divide(S, K, out=call)
+    np.log(call, out=call)
+    call += (r + 0.5 * sigma * sigma) * T
+    call /= vol_sqrt_t
+    d_1 = call
+    # d2 = d1 - sigma * sqrt(T), built in the put buffer
+    d_2 = np.subtract(d_1, vol_sqrt_t, out=put)
+
+    # Discounted strike K * exp(-r * T)
+    k_disc = K * np.exp(-r * T)
+
+    # Both tails are evaluated directly rather than through put-call parity,
+    # which loses all precision for deep out-of-the-money puts.
+    n_d1, n_minus_d1 = _norm_cdf_pair(d_1)
+    n_d2, n_minus_d2 = _norm_cdf_pair(d_2)
+
+    np.multiply(S, n_d1, out=call)
+    call -= k_disc * n_d2
+    np.multiply(k_disc, n_minus_d2, out=put)
+    put -= S * n_minus_d1
+    return _scalar_or_array(call), _scalar_or_array(put)
+
+def _is_scalar(x):
+    return isinstance(x, (float, int, np.floating, np.integer)) or (isinstance(x, np.ndarray) and x.ndim == 0)
+
+# Same formula for one contract with the math module: at a single contract
+# the array path's allocations and masking cost far more than the
+# arithmetic. N(x) = erfc(-x / sqrt(2)) / 2 keeps full precision in both tails.
+def _bs_price_scalar(S, K, T, r, sigma):
+    vol_sqrt_t = sigma * math.sqrt(T)
+    d_1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / vol_sqrt_t
+    d_2 = d_1 - vol_sqrt_t
+    k_disc = K * math.exp(-r * T)
+    call = 0.5 * (S * math.erfc(-d_1 * _SQRT_HALF) - k_disc * math.erfc(-d_2 * _SQRT_HALF))
+    put = 0.5 * (k_disc * math.erfc(d_2 * _SQRT_HALF) - S * math.erfc(d_1 * _SQRT_HALF))
+    return np.float64(call), np.float64(put)
+
+_SQRT_HALF = math.sqrt(0.5)
 
 # Define the Black Scholes Call Option formula
 def bs_call(S, K, T, r, sigma):
-    return S * norm.cdf(d1(S, K, T, r, sigma)) - K * exp(-r * T) * norm.cdf(d2(S, K, T, r, sigma))
+    return bs_price(S, K, T, r, sigma)[0]
 
 # Define the Black Scholes Put Option formula
 def bs_put(S, K, T, r, sigma):
-    return K * exp(-r * T) - S + bs_call(S, K, T, r, sigma)
+    return bs_price(S, K, T, r, sigma)[1]
 
-if __name__ == "__main__":
+# Price and Greeks returned by bs_greeks, one array per field.
+# Theta, charm and veta are derivatives with respect to calendar time in
+# years; vega, vanna and vomma are per unit (not per percentage point) of
+# volatility; rho is per unit of rate.
+Greeks = namedtuple("Greeks", [
+    "call", "put",
+    "delta_call", "delta_put", "gamma", "vega",
+    "theta_call", "theta_put", "rho_call", "rho_put",
+    "vanna", "vomma", "charm", "veta",
+])
+
+
+# Compute prices plus all first- and second-order Greeks in one pass.
+# d1, d2, pdf(d1), the normal tails and the discount factor are computed once
+# and reused by every output. Every field is written straight into one
+# float64 block of shape (len(Greeks._fields), *broadcast_shape); with
+# as_array=True that block is returned as is, otherwise a Greeks tuple of
+# views into it.
+def bs_greeks(S, K, T, r, sigma, as_array=False):
+    S, K, T, r, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+    shape = np.broadcast_shapes(S.shape, K.shape, T.shape, r.shape, sigma.shape)
+    block = np.empty((len(Greeks._fields),) + shape)
+    g = Greeks(*(block[i, ...] for i in range(len(block))))
+
+    sqrt_t = np.sqrt(T)
+    vol_sqrt_t = sigma * sqrt_t
+    d_1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / vol_sqrt_t
+    d_2 = d_1 - vol_sqrt_t
+    k_disc = K * np.exp(-r * T)
+    pdf_d1 = _INV_SQRT_2PI * np.exp(-0.5 * d_1 * d_1)
+    n_d1, n_minus_d1 = _norm_cdf_pair(d_1)
+    n_d2, n_minus_d2 = _norm_cdf_pair(d_2)
+    s_pdf = S * pdf_d1
 
+    np.subtract(S * n_d1, k_disc * n_d2, out=g.call)
+    np.subtract(k_disc * n_minus_d2, S * n_minus_d1, out=g.put)
+    g.delta_call[...] = n_d1
+    np.negative(n_minus_d1, out=g.delta_put)
+    np.divide(pdf_d1, S * vol_sqrt_t, out=g.gamma)
+    np.multiply(s_pdf, sqrt_t, out=g.vega)
+
+    decay = -0.5 * s_pdf * sigma / sqrt_t
+    r_k_disc = r * k_disc
+    np.subtract(decay, r_k_disc * n_d2, out=g.theta_call)
+    np.add(decay, r_k_disc * n_minus_d2, out=g.theta_put)
+    np.multiply(k_disc * T, n_d2, out=g.rho_call)
+    np.multiply(-k_disc * T, n_minus_d2, out=g.rho_put)
+
+    np.multiply(-pdf_d1 / sigma, d_2, out=g.vanna)
+    np.multiply(g.vega, d_1 * d_2 / sigma, out=g.vomma)
+    # Without dividends charm is the same for calls and puts
+    np.multiply(-pdf_d1, (2.0 * r * T - d_2 * vol_sqrt_t) / (2.0 * T * vol_sqrt_t), out=g.charm)
+    np.multiply(g.vega, r * d_1 / vol_sqrt_t - (1.0 + d_1 * d_2) / (2.0 * T), out=g.veta)
+
+    if as_array:
+        return block
+    return Greeks(*(_scalar_or_array(x) for x in g))
+
+# Back out implied volatility from quoted prices for a whole chain at once.
+# call is a boolean (or boolean array) choosing between call and put quotes.
+# Starts from the Brenner-Subrahmanyam / Corrado-Miller estimate and takes
+# at most max_iter vectorized Halley steps. Each contract keeps a bracket
+# [lo, hi] around the root and falls back to bisection whenever a step
+# leaves it, and contracts drop out of the working set once the estimated
+# error in sigma is below tol or the quote is reproduced. Returns
+# (sigma, converged); quotes outside the no-arbitrage bounds give
+# sigma = nan and converged = False.
+def implied_vol(price, S, K, T, r, call=True, tol=1e-8, max_iter=20,
+                sigma_min=1e-6, sigma_max=10.0):
+    price, S, K, T, r, call = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (price, S, K, T, r)),
+        np.asarray(call, dtype=bool))
+    shape = price.shape
+    price, S, K, T, r = (x.ravel() for x in (price, S, K, T, r))
+    # +1 for calls, -1 for puts
+    w = np.where(call.ravel(), 1.0, -1.0)
+
+    k_disc = K * np.exp(-r * T)
+    sqrt_t = np.sqrt(T)
+    intrinsic = np.maximum(w * (S - k_disc), 0.0)
+    upper = np.where(w > 0, S, k_disc)
+    valid = (price > intrinsic) & (price < upper) & (T > 0)
+
+    # Corrado-Miller initial guess, computed on the call-equivalent price
+    call_price = np.where(w > 0, price, price + S - k_disc)
+    half_fwd = 0.5 * (S - k_disc)
+    excess = call_price - half_fwd
+    radicand = np.maximum(excess * excess - (S - k_disc) ** 2 / np.pi, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        guess = np.sqrt(2.0 * np.pi) / (sqrt_t * (S + k_disc)) * (excess + np.sqrt(radicand))
+    sigma = np.clip(np.nan_to_num(guess, nan=0.2), 0.01, 2.0)
+
+    sigma[~valid] = np.nan
+    converged = np.zeros(sigma.shape, dtype=bool)
+    lo = np.full(sigma.shape, sigma_min)
+    hi = np.full(sigma.shape, sigma_max)
+    active = np.flatnonzero(valid)
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        a_s, a_sig, a_w, a_kd = S[active], sigma[active], w[active], k_disc[active]
+        a_sqrt_t = sqrt_t[active]
+
+        vol_sqrt_t = a_sig * a_sqrt_t
+        d_1 = (np.log(S[active] / K[active]) + (r[active] + 0.5 * a_sig * a_sig) * T[active]) / vol_sqrt_t
+        d_2 = d_1 - vol_sqrt_t
+        n_1, n_2 = np.split(_norm_cdf(np.concatenate((a_w * d_1, a_w * d_2))), 2)
+        model = a_w * (a_s * n_1 - a_kd * n_2)
+        vega = a_s * a_sqrt_t * _INV_SQRT_2PI * np.exp(-0.5 * d_1 * d_1)
+        diff = model - price[active]
+
+        # Price is increasing in sigma, so the sign of diff tightens the bracket
+        a_lo = np.where(diff < 0, a_sig, lo[active])
+        a_hi = np.where(diff > 0, a_sig, hi[active])
+
+        # Halley step: f''/f' = d1 * d2 / sigma for the Black-Scholes price.
+        # Fall back to the Newton step where the Halley correction is too large.
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = diff / vega
+            halley_den = 1.0 - 0.5 * newton * d_1 * d_2 / a_sig
+            step = np.where(halley_den > 0.5, newton / halley_den, newton)
+        new_sig = a_sig - step
+        outside = ~((new_sig >= a_lo) & (new_sig <= a_hi))
+        new_sig[outside] = 0.5 * (a_lo[outside] + a_hi[outside])
+
+        # The Newton step estimates the remaining error in sigma. Also stop once
+        # the quote is reproduced to ~1e-12 relative: deep in-the-money contracts
+        # have almost no time value, so sigma cannot be pinned down further.
+        done = (np.abs(newton) < tol) | (np.abs(diff) <= 1e-12 * price[active])
+        sigma[active] = new_sig
+        lo[active] = a_lo
+        hi[active] = a_hi
+        converged[active[done]] = True
+        active = active[~done]
+
+    return _scalar_or_array(sigma.reshape(shape)), _scalar_or_array(converged.reshape(shape))
+
+# Unwrap 0-d arrays so scalar inputs keep giving scalar results
+def _scalar_or_array(x):
+    return x[()] if np.ndim(x) == 0 else x
+
+# Command line entry point. With --batch, prices a CSV or Parquet file of
+# contracts non-interactively; otherwise prompts for a single contract.
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Black-Scholes option pricer")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="CSV or Parquet file of contracts with S, K, T (years), r and sigma columns")
+    parser.add_argument("--output", metavar="OUTPUT", help="where to write the priced contracts (CSV or Parquet)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows priced per chunk (default: 100000)")
+    parser.add_argument("--greeks", action="store_true", help="also write Greeks for every contract")
+    args = parser.parse_args(argv)
+
+    if args.batch is None:
+        _interactive()
+        return
+    if args.output is None:
+        parser.error("--output is required with --batch")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+
+    from batch_pricing import price_file
+    price_file(args.batch, args.output, chunk_size=args.chunk_size, greeks=args.greeks)
+
+def _interactive():
     # Ask the user if the want to use real stock data or manually input the variables
     data_choice = input ("Do you want to use real stock data or manually input the variables? (r/m): ")
 
     if data_choice == 'r':
         # Fetch real stock data and calculate options prices
         stock = str(input("select the stock you want: "))
-        data = yf.download(stock, period="1y")  # Download 1 year of data using yfinance
-        current_price = round(data["Adj Close"].iloc[-1], 2)
+        from market_data import MarketDataCache
+        from volatility import historical_volatility
+
+        data = MarketDataCache().history(stock)  # 1 year of data, fetched through the local cache
+        current_price = round(float(data["Close"].iloc[-1]), 2)
         print("The current price of", stock, " is: ", current_price)
         choice = input("Want to price a call or a put ? (c/p): ")
         expiry = str(input("Select the expiry date (format mm-dd-YYYY): "))
         strike_price = int(input("Select the strike price: "))
-        data["returns"] = data["Close"].pct_change()
-        sigma = np.sqrt(252) * data["returns"].std()
+        sigma = historical_volatility(data["Close"].to_numpy())  # annualised, from daily log returns
 
         # Assume a risk-free rate of 2% or any other rate // did this beacuse yfinance was struggling to calcluate the risk free rate from the treasury data. Will fix later
         ty10y = 0.02
@@ -53,7 +389,10 @@ if __name__ == "__main__":
         if choice == "c":
             print("The Call Option Price is: ", bs_call(current_price, strike_price, t, ty10y, sigma))
         if choice == "p":
-            print("The Put Option Price is: ", bs_put(current_price, strike_price, t, ty10y, sigma))
+            # Listed stock options are American; early exercise can pay for puts
+            from lattice import american_price
+
+            print("The American Put Option Price is: ", american_price(current_price, strike_price, t, ty10y, sigma, call=False))
 
     elif data_choice == 'm':
         # Ask the user to input their own values for the variables
@@ -71,4 +410,5 @@ if __name__ == "__main__":
         if choice == "p":
             print("The Put Price is: ", bs_put(S, K, T, r, sigma))
 
-
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# Batch pricing HTTP API, mounted on the dashboard's Flask server.
+#
+#   POST /api/v1/price         S, K, T, r, sigma                -> call, put
+#   POST /api/v1/greeks        S, K, T, r, sigma                -> every Greeks field
+#                              (?fields=delta_call,gamma to pick some)
+#   POST /api/v1/implied_vol   price, S, K, T, r[, call]        -> sigma, converged
+#
+# Requests and responses are columnar: one array per input or output, with
+# scalars broadcast against the arrays. T is in years, r and sigma are
+# decimals, and call defaults to true. The body format follows Content-Type:
+#
+#   application/json                       {"S": [...], "K": [...], "T": 0.5, ...}
+#   application/x-npz                      numpy.savez archive, one array per name
+#   application/vnd.apache.arrow.stream    Arrow IPC stream, one column per name
+#                                          (scalars not allowed; needs pyarrow)
+#
+# The response uses the request's format unless Accept asks for another one.
+# JSON responses encode NaN (e.g. a quote outside the no-arbitrage bounds)
+# as null. Errors are JSON {"error": message} with status 400, 413 when the
+# body or the number of contracts is over the limit, or 503 when
+# max_concurrent requests are already being priced.
+
+import io
+import json
+import os
+import threading
+
+import numpy as np
+
+from BlackScholesPricingModel import Greeks, bs_greeks, bs_price, implied_vol
+from metrics import REGISTRY
+
+JSON = "application/json"
+NPZ = "application/x-npz"
+ARROW = "application/vnd.apache.arrow.stream"
+FORMATS = (JSON, NPZ, ARROW)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_CONTRACTS = 1_000_000
+DEFAULT_MAX_CONCURRENT = 4
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# Add the /api/v1 routes to a Flask app. Limits default to the BS_API_MAX_BYTES,
+# BS_API_MAX_CONTRACTS and BS_API_MAX_CONCURRENT environment variables, then
+# to the DEFAULT_ values above. max_bytes becomes the app's
+# MAX_CONTENT_LENGTH unless one is configured already.
+def register_api(server, max_bytes=None, max_contracts=None, max_concurrent=None, registry=REGISTRY):
+    from flask import Response, jsonify, request
+    from werkzeug.exceptions import RequestEntityTooLarge
+
+    max_bytes = max_bytes or int(os.environ.get("BS_API_MAX_BYTES", DEFAULT_MAX_BYTES))
+    max_contracts = max_contracts or int(os.environ.get("BS_API_MAX_CONTRACTS", DEFAULT_MAX_CONTRACTS))
+    max_concurrent = max_concurrent or int(os.environ.get("BS_API_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT))
+    if server.config.get("MAX_CONTENT_LENGTH") is None:
+        server.config["MAX_CONTENT_LENGTH"] = max_bytes
+    slots = threading.BoundedSemaphore(max_concurrent)
+
+    def handle(endpoint, names, optional, compute):
+        # Reject rather than queue: a pricing request holds its whole batch
+        # in memory, and callers can retry against another worker
+        if not slots.acquire(blocking=False):
+            registry.inc("bs_api_rejected_total", endpoint=endpoint, reason="busy")
+            return _error("Too many concurrent requests", 503, {"Retry-After": "1"})
+        try:
+            fmt = request.mimetype if request.mimetype in FORMATS else JSON
+            with registry.stage("api_decode"):
+                columns = _decode(request.get_data(cache=False), fmt)
+                inputs = _inputs(columns, names, optional, max_contracts)
+            with registry.stage(f"api_{endpoint}"):
+                outputs = compute(*inputs)
+            accept = request.accept_mimetypes
+            out_fmt = fmt if accept.quality(fmt) or not accept else accept.best_match(FORMATS, JSON)
+            with registry.stage("api_encode"):
+                body = _encode(outputs, out_fmt)
+            registry.inc("bs_api_contracts_total", amount=inputs[0].size, endpoint=endpoint)
+            return Response(body, mimetype=out_fmt)
+        except RequestEntityTooLarge:
+            registry.inc("bs_api_rejected_total", endpoint=endpoint, reason="too_large")
+            return _error(f"Request body larger than {server.config['MAX_CONTENT_LENGTH']} bytes", 413)
+        except ApiError as e:
+            reason = "too_large" if e.status == 413 else "invalid"
+            registry.inc("bs_api_rejected_total", endpoint=endpoint, reason=reason)
+            return _error(str(e), e.status)
+        finally:
+            slots.release()
+
+    def _error(message, status, headers=None):
+        response = jsonify(error=message)
+        response.status_code = status
+        response.headers.update(headers or {})
+        return response
+
+    @server.route("/api/v1/price", methods=["POST"])
+    def _api_price():
+        def compute(S, K, T, r, sigma):
+            call, put = bs_price(S, K, T, r, sigma)
+            return {"call": call, "put": put}
+        return handle("price", ("S", "K", "T", "r", "sigma"), {}, compute)
+
+    @server.route("/api/v1/greeks", methods=["POST"])
+    def _api_greeks():
+        fields = request.args.get("fields")
+        fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(Greeks._fields)
+        unknown = [f for f in fields if f not in Greeks._fields]
+        if unknown:
+            return _error(f"Unknown Greeks fields: {', '.join(unknown)}", 400)
+
+        def compute(S, K, T, r, sigma):
+            block = bs_greeks(S, K, T, r, sigma, as_array=True)
+            return {f: block[Greeks._fields.index(f)] for f in fields}
+        return handle("greeks", ("S", "K", "T", "r", "sigma"), {}, compute)
+
+    @server.route("/api/v1/implied_vol", methods=["POST"])
+    def _api_implied_vol():
+        def compute(price, S, K, T, r, call):
+            sigma, converged = implied_vol(price, S, K, T, r, call=call != 0)
+            return {"sigma": sigma, "converged": converged}
+        return handle("implied_vol", ("price", "S", "K", "T", "r"), {"call": 1.0}, compute)
+
+    return server
+
+
+# Parse a request body into {name: ndarray}
+def _decode(body, fmt):
+    if not body:
+        raise ApiError("Empty request body")
+    try:
+        if fmt == NPZ:
+            with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+                return {name: archive[name] for name in archive.files}
+        if fmt == ARROW:
+            import pyarrow as pa
+
+            table = pa.ipc.open_stream(body).read_all()
+            return {name: table.column(name).to_numpy() for name in table.column_names}
+        columns = json.loads(body)
+    except ImportError:
+        raise ApiError("Arrow payloads need pyarrow installed on the server", 415)
+    except Exception as e:
+        raise ApiError(f"Could not parse {fmt} body: {e}")
+    if not isinstance(columns, dict):
+        raise ApiError("JSON body must be an object of columns")
+    return columns
+
+
+# Convert the named columns to float64, broadcast them to one 1-D shape and
+# check the contract count
+def _inputs(columns, names, optional, max_contracts):
+    missing = [name for name in names if name not in columns]
+    if missing:
+        raise ApiError(f"Missing inputs: {', '.join(missing)}")
+    arrays = []
+    for name in names + tuple(optional):
+        try:
+            value = np.asarray(columns.get(name, optional.get(name)), dtype=float)
+        except (TypeError, ValueError):
+            raise ApiError(f"{name} must be numeric")
+        if value.ndim > 1:
+            raise ApiError(f"{name} must be a scalar or a 1-D array")
+        if value.size > max_contracts:
+            raise ApiError(f"At most {max_contracts} contracts per request", 413)
+        arrays.append(value)
+    try:
+        shape = np.broadcast_shapes(*(a.shape for a in arrays))
+    except ValueError:
+        raise ApiError("Input arrays have different lengths")
+    size = int(np.prod(shape))
+    if size > max_contracts:
+        raise ApiError(f"At most {max_contracts} contracts per request", 413)
+    return [np.broadcast_to(a, (size,)) for a in arrays]
+
+
+def _encode(outputs, fmt):
+    if fmt == NPZ:
+        buffer = io.BytesIO()
+        np.savez(buffer, **outputs)
+        return buffer.getvalue()
+    if fmt == ARROW:
+        import pyarrow as pa
+
+        table = pa.table(outputs)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return json.dumps({name: _json_column(values) for name, values in outputs.items()})
+
+
+def _json_column(values):
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values.tolist()
+    column = values.tolist()
+    if not np.isfinite(values).all():
+        column = [v if v == v and abs(v) != float("inf") else None for v in column]
+    return column
@@ -0,0 +1,130 @@
+# Streaming batch pricing for large position files.
+#
+# Contracts are read from a CSV or Parquet file in fixed-size chunks, each
+# chunk is priced with the vectorized engine and written straight back out,
+# so memory use depends on the chunk size and not on the file size. The
+# input needs S, K, T (in years), r and sigma columns; any other columns
+# are passed through unchanged.
+
+import sys
+import time
+
+import pandas as pd
+
+from BlackScholesPricingModel import Greeks, bs_greeks, bs_price
+
+INPUT_COLUMNS = ["S", "K", "T", "r", "sigma"]
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _is_parquet(path):
+    return str(path).lower().endswith((".parquet", ".pq"))
+
+
+def _read_chunks(path, chunk_size):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class _ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._started = False
+
+    def write(self, frame):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                table = self._first_table(table)
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = self._conform(table)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="a" if self._started else "w",
+                         header=not self._started, index=False)
+        self._started = True
+
+    # The file schema is fixed by the first chunk. Columns that are entirely
+    # empty there have no meaningful type yet, so they are written as strings,
+    # which any later values can be cast to.
+    @staticmethod
+    def _first_table(table):
+        import pyarrow as pa
+
+        fields = [pa.field(f.name, pa.string()) if table.column(i).null_count == len(table) else f
+                  for i, f in enumerate(table.schema)]
+        return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+    # Cast a later chunk to the file schema; CSV chunks infer their own
+    # dtypes, e.g. an integer column turns float once it has missing values
+    def _conform(self, table):
+        import pyarrow as pa
+
+        schema = self._parquet_writer.schema
+        if table.schema.names != schema.names:
+            raise ValueError(f"Columns changed between chunks: {table.schema.names} vs {schema.names}")
+        columns = []
+        for name, field in zip(schema.names, schema):
+            column = table.column(name)
+            try:
+                columns.append(column.cast(field.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(f"Column {name!r} is {field.type} in earlier chunks but cannot be "
+                                 f"converted from {column.type} in a later one: {e}") from e
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+# Price one chunk of contracts; returns the chunk with result columns appended
+def price_frame(frame, greeks=False):
+    missing = [c for c in INPUT_COLUMNS if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+    S, K, T, r, sigma = (frame[c].to_numpy(dtype=float) for c in INPUT_COLUMNS)
+
+    if greeks:
+        block = bs_greeks(S, K, T, r, sigma, as_array=True)
+        results = dict(zip(Greeks._fields, block))
+    else:
+        call, put = bs_price(S, K, T, r, sigma)
+        results = {"call": call, "put": put}
+    return frame.assign(**results)
+
+
+# Price every contract in input_path and write the results to output_path.
+# Progress and throughput are reported to progress (stderr by default; pass
+# None to silence). Returns the number of rows priced.
+def price_file(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, greeks=False,
+               progress=sys.stderr):
+    writer = _ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for chunk in _read_chunks(input_path, chunk_size):
+            writer.write(price_frame(chunk, greeks=greeks))
+            rows += len(chunk)
+            if progress is not None:
+                elapsed = time.perf_counter() - start
+                print(f"{rows:,} rows priced, {rows / max(elapsed, 1e-9):,.0f} rows/s",
+                      file=progress, flush=True)
+    finally:
+        writer.close()
+
+    if progress is not None:
+        elapsed = time.perf_counter() - start
+        print(f"Done: {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)",
+              file=progress, flush=True)
+    return rows
@@ -0,0 +1,266 @@
+# Reproducible benchmarks for the pricing engine and the dashboard callback.
+#
+#   python benchmarks.py --output bench.json                 # run and save results
+#   python benchmarks.py --baseline bench_baseline.json      # also compare, exit 1 on regressions
+#   python benchmarks.py --output bench_baseline.json --sizes 1,1000,1000000   # refresh a baseline
+#
+# Timings are the median of several rounds on fixed-seed inputs, and the
+# whole suite runs in --runs fresh interpreters whose results are combined
+# by taking the median again, so one slow process cannot skew a result.
+# Results are written as JSON: {"meta": {...}, "results": {name: {"value",
+# "unit", "higher_is_better", "spread"}}}, where spread is the percentage
+# range between the slowest and fastest measurements. Compared with a
+# baseline, a result counts as a regression when it is worse by more than
+# --threshold percent and by more than the spread of either side.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from BlackScholesPricingModel import bs_call, bs_greeks, bs_price, implied_vol
+
+DEFAULT_SIZES = (1, 1_000, 1_000_000, 10_000_000)
+DEFAULT_RUNS = 3
+DEFAULT_THRESHOLD = 25.0
+SCALAR_LOOP_CAP = 10_000  # larger scalar-loop sizes are timed on this many contracts
+
+
+def _contracts(n, seed=0):
+    rng = np.random.default_rng(seed)
+    S = rng.uniform(50.0, 150.0, n)
+    K = rng.uniform(50.0, 150.0, n)
+    T = rng.uniform(0.05, 2.0, n)
+    sigma = rng.uniform(0.1, 0.6, n)
+    return S, K, T, 0.03, sigma
+
+
+# Wall time of one call to fn over repeat rounds, each running fn enough
+# times to last at least min_time seconds: the median round, and the range
+# of the rounds as a percentage of it
+def _time(fn, repeat=7, min_time=0.2):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return _median_spread(times)
+
+
+def _median_spread(values):
+    median = float(np.median(values))
+    return median, (max(values) - min(values)) / median * 100.0 if median else 0.0
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_pricing(sizes, results):
+    for n in sizes:
+        S, K, T, r, sigma = _contracts(n)
+
+        loop_n = min(n, SCALAR_LOOP_CAP)
+        args = [(float(S[i]), float(K[i]), float(T[i]), r, float(sigma[i])) for i in range(loop_n)]
+        elapsed, spread = _time(lambda: [bs_call(*a) for a in args], repeat=5)
+        results[f"scalar_loop_throughput_n{n}"] = (loop_n / elapsed, "contracts/s", True, spread)
+
+        repeat = 5 if n >= 1_000_000 else 7
+        elapsed, spread = _time(lambda: bs_price(S, K, T, r, sigma), repeat=repeat)
+        results[f"batch_throughput_n{n}"] = (n / elapsed, "contracts/s", True, spread)
+        results[f"batch_peak_memory_n{n}"] = (_peak_memory(lambda: bs_price(S, K, T, r, sigma)), "bytes", False, 0.0)
+
+
+def bench_greeks_and_iv(results):
+    n = 100_000
+    S, K, T, r, sigma = _contracts(n, seed=1)
+    elapsed, spread = _time(lambda: bs_greeks(S, K, T, r, sigma, as_array=True))
+    results[f"greeks_throughput_n{n}"] = (n / elapsed, "contracts/s", True, spread)
+    results[f"greeks_peak_memory_n{n}"] = (
+        _peak_memory(lambda: bs_greeks(S, K, T, r, sigma, as_array=True)), "bytes", False, 0.0)
+
+    # A 5,000-strike chain of out-of-the-money quotes, the dashboard's typical shape
+    strikes = np.linspace(50.0, 150.0, 5_000)
+    vols = 0.2 + 0.1 * ((strikes - 100.0) / 50.0) ** 2
+    calls, puts = bs_price(100.0, strikes, 0.25, 0.03, vols)
+    is_call = strikes > 100.0
+    quotes = np.where(is_call, calls, puts)
+    elapsed, spread = _time(lambda: implied_vol(quotes, 100.0, strikes, 0.25, 0.03, is_call))
+    results["implied_vol_chain_n5000"] = (elapsed * 1e3, "ms", False, spread)
+
+
+# Median wall time of a fresh interpreter importing the pricing module
+def bench_import(results, runs=5):
+    code = ("import time; t = time.perf_counter(); import BlackScholesPricingModel; "
+            "print(time.perf_counter() - t)")
+    here = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                             text=True, check=True)
+        times.append(float(out.stdout.strip()))
+    median, spread = _median_spread(times)
+    results["import_time"] = (median * 1e3, "ms", False, spread)
+
+
+# End-to-end latency of the dashboard callback with market data served from
+# a local CSV stub, with cold and warm result caches
+def bench_callback(results, workdir):
+    try:
+        import pandas as pd
+        import dashboard
+        from market_data import CSVProvider, MarketDataCache
+        from result_cache import ResultCache
+    except ImportError as e:
+        print(f"Skipping callback benchmarks: {e}", file=sys.stderr)
+        return
+
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=260)
+    closes = 150.0 * np.exp(np.cumsum(np.random.default_rng(2).normal(0.0, 0.015, len(dates))))
+    pd.DataFrame({"Close": closes}, index=dates).to_csv(os.path.join(workdir, "STUB.csv"))
+
+    dashboard.market_data = MarketDataCache(CSVProvider(workdir), cache_dir=os.path.join(workdir, "md"))
+    dashboard.result_cache = ResultCache(os.path.join(workdir, "results.sqlite"))
+    expiry = (pd.Timestamp.today() + pd.Timedelta(days=90)).strftime("%Y-%m-%d")
+    args = (1, "real", "STUB", 150, expiry, "call", None, None, None, None, None, None)
+
+    def cold():
+        dashboard.result_cache.clear()
+        dashboard.calculate_option_price(*args)
+
+    elapsed, spread = _time(cold, repeat=5)
+    results["callback_latency_cold"] = (elapsed * 1e3, "ms", False, spread)
+    dashboard.calculate_option_price(*args)
+    elapsed, spread = _time(lambda: dashboard.calculate_option_price(*args))
+    results["callback_latency_warm"] = (elapsed * 1e3, "ms", False, spread)
+
+
+def run(sizes, callback=True):
+    results = {}
+    bench_pricing(sizes, results)
+    bench_greeks_and_iv(results)
+    bench_import(results)
+    if callback:
+        with tempfile.TemporaryDirectory() as workdir:
+            bench_callback(results, workdir)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": {name: {"value": value, "unit": unit, "higher_is_better": higher, "spread": spread}
+                    for name, (value, unit, higher, spread) in results.items()},
+    }
+
+
+# Run the suite in runs fresh interpreters and keep the median of each
+# result. Its spread is the wider of the range across runs and the median
+# spread within a run.
+def run_isolated(sizes, callback=True, runs=DEFAULT_RUNS):
+    here = os.path.abspath(__file__)
+    reports = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for i in range(runs):
+            path = os.path.join(workdir, f"run{i}.json")
+            cmd = [sys.executable, here, "--runs", "1", "--sizes", ",".join(str(n) for n in sizes), "--output", path]
+            if not callback:
+                cmd.append("--no-callback")
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+            with open(path) as f:
+                reports.append(json.load(f))
+
+    results = {}
+    for name, first in reports[0]["results"].items():
+        measured = [report["results"][name] for report in reports if name in report["results"]]
+        value, across = _median_spread([m["value"] for m in measured])
+        within = float(np.median([m["spread"] for m in measured]))
+        results[name] = dict(first, value=value, spread=max(across, within))
+    return {"meta": dict(reports[0]["meta"], runs=runs), "results": results}
+
+
+# Print current vs baseline and return the names of regressed results: those
+# worse by more than threshold percent and by more than either side's spread
+def compare(current, baseline, threshold):
+    regressions = []
+    print(f"{'benchmark':<34}{'baseline':>16}{'current':>16}{'change':>10}{'noise':>9}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<34}{'-':>16}{result['value']:>16.4g}")
+            continue
+        change = (result["value"] - base["value"]) / base["value"] * 100.0
+        worse = -change if result["higher_is_better"] else change
+        noise = max(result.get("spread", 0.0), base.get("spread", 0.0))
+        flag = "  REGRESSION" if worse > max(threshold, noise) else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<34}{base['value']:>16.4g}{result['value']:>16.4g}{change:>+9.1f}%{noise:>8.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Black-Scholes pricing engine")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES),
+                        help="comma-separated contract counts for the pricing benchmarks")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="percent worsening that counts as a regression when it is also beyond the "
+                             f"measured spread (default: {DEFAULT_THRESHOLD:g})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"fresh interpreters to run the suite in, combined by median (default: {DEFAULT_RUNS})")
+    parser.add_argument("--no-callback", action="store_true", help="skip the dashboard callback benchmarks")
+    args = parser.parse_args(argv)
+
+    sizes = [int(float(n)) for n in args.sizes.split(",")]
+    if args.runs > 1:
+        current = run_isolated(sizes, callback=not args.no_callback, runs=args.runs)
+    else:
+        current = run(sizes, callback=not args.no_callback)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:g}% and the noise: "
+                  f"{', '.join(regressions)}")
+            return 1
+    else:
+        for name, result in current["results"].items():
+            print(f"{name:<34}{result['value']:>16.4g} {result['unit']:<12} ±{result['spread'] / 2:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
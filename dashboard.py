@@ -1,27 +1,98 @@
 # Import necessary libraries
 import dash
-from dash import dcc, html
+from dash import Patch, dcc, html
 from dash.dependencies import Input, Output, State
-import yfinance as yf
+import base64
+import os
+import threading
+from collections import OrderedDict
 import numpy as np
-from scipy.stats import norm
 from datetime import date, datetime, timedelta
 import plotly.graph_objs as go
+from BlackScholesPricingModel import Greeks, bs_greeks, bs_price
+from lattice import american_price
+from market_data import MarketDataCache
+from result_cache import ResultCache
+from volatility import RollingVolatility, VolatilityTracker
+from metrics import REGISTRY as metrics, init_app
+from api import register_api
 
 # Initialize the Dash app
 app = dash.Dash(__name__)
 server = app.server
 
-# Black-Scholes formula functions
-def bs_call(S, K, T, r, sigma):
-    d1 = (np.log(S/K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    return S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+# Cached per-symbol price history shared by every callback
+market_data = MarketDataCache()
 
-def bs_put(S, K, T, r, sigma):
-    d1 = (np.log(S/K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    return K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+# Running 1-year rolling volatility per symbol
+vol_tracker = VolatilityTracker(lambda: RollingVolatility(window=252))
+
+# Computed prices and figures, shared by every Dash worker process on this machine
+result_cache = ResultCache()
+
+# Encoded strike x expiry surfaces (about 1.4 MB each), kept in a smaller cache of their own
+surface_cache = ResultCache(os.path.join(os.path.dirname(result_cache.path), 'surfaces.sqlite'), max_entries=64)
+
+# Format versions of the cached values, part of every cache key. The cache
+# files outlive deployments, so bump RESULT_VERSION whenever the pricing or
+# the figures stored by price_and_plot change, and SURFACE_VERSION whenever
+# the surface values change; entries under the old version are then never
+# served again and age out of the LRU.
+RESULT_VERSION = 1
+SURFACE_VERSION = 1
+
+# Metrics available on the strike x expiry surface: label, then the Greeks
+# field used for calls and for puts
+SURFACE_METRICS = {
+    'price': ('Price', 'call', 'put'),
+    'delta': ('Delta', 'delta_call', 'delta_put'),
+    'gamma': ('Gamma', 'gamma', 'gamma'),
+    'vega': ('Vega', 'vega', 'vega'),
+    'theta': ('Theta (per year)', 'theta_call', 'theta_put'),
+    'rho': ('Rho', 'rho_call', 'rho_put'),
+    'vanna': ('Vanna', 'vanna', 'vanna'),
+    'vomma': ('Vomma', 'vomma', 'vomma'),
+}
+SURFACE_STRIKES = 500
+SURFACE_EXPIRIES = 500
+SURFACE_MAX_DAYS = 730
+
+# Every metric's grid for the most recent surfaces, per (S, r, sigma, option
+# type) and per process. bs_greeks computes all the fields in one pass, so a
+# surface cache miss for another metric of the same surface only re-encodes
+# a grid kept here instead of re-running it.
+SURFACE_GRIDS = 4
+_surface_grids = OrderedDict()
+_surface_grids_lock = threading.Lock()
+
+# Lattice steps for the 50-point American price curves (with smoothing and
+# Richardson extrapolation, within about 0.01 of the 500-step headline price)
+CURVE_LATTICE_STEPS = 100
+
+# Empty heatmap the surface callback patches into
+SURFACE_FIGURE = go.Figure(
+    data=[go.Heatmap(x=[], y=[], z=[], colorscale='Viridis', colorbar={'title': {'text': 'Price'}})],
+    layout=go.Layout(
+        xaxis={'title': 'Strike Price'},
+        yaxis={'title': 'Days to Expiry'},
+        margin={'l': 40, 'b': 40, 't': 10, 'r': 10}
+    )
+).to_dict()
+
+# Per-stage timings, request counts and cache hit rates on /metrics
+init_app(server)
+
+def _cache_samples():
+    for name, cache in (('market_data', market_data), ('result', result_cache), ('surface', surface_cache)):
+        lookups = cache.hits + cache.misses
+        yield 'bs_cache_hits_total', 'counter', {'cache': name}, cache.hits
+        yield 'bs_cache_misses_total', 'counter', {'cache': name}, cache.misses
+        yield 'bs_cache_hit_ratio', 'gauge', {'cache': name}, cache.hits / lookups if lookups else 0.0
+
+metrics.add_collector(_cache_samples)
+
+# Batch pricing, Greeks and implied vol endpoints under /api/v1
+register_api(server)
 
 # Define the app layout
 app.layout = html.Div([
@@ -124,7 +195,27 @@ app.layout = html.Div([
     ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top', 'padding': '20px'}),
     
     # Results area with visualizations
-    html.Div(id='output-area', style={'width': '55%', 'display': 'inline-block', 'verticalAlign': 'top', 'padding': '20px'})
+    html.Div([
+        html.Div(id='output-area'),
+        
+        # Strike x expiry surface, updated in place by update_surface
+        html.Div(
+            id='surface-area',
+            children=[
+                html.H4("Strike × Expiry Surface", style={'textAlign': 'center'}),
+                dcc.Dropdown(
+                    id='surface-metric',
+                    options=[{'label': label, 'value': value} for value, (label, _, _) in SURFACE_METRICS.items()],
+                    value='price',
+                    clearable=False
+                ),
+                dcc.Graph(id='surface-graph', figure=SURFACE_FIGURE),
+            ],
+            style={'display': 'none'}
+        ),
+        dcc.Store(id='surface-params'),
+        dcc.Store(id='surface-rendered'),
+    ], style={'width': '55%', 'display': 'inline-block', 'verticalAlign': 'top', 'padding': '20px'})
 ], style={'fontFamily': 'Arial, sans-serif', 'margin': '0 auto', 'maxWidth': '1200px'})
 
 # Callback to toggle between input forms
@@ -141,7 +232,8 @@ def toggle_input_forms(choice):
 
 # Callback for calculating option price with visualizations
 @app.callback(
-    Output('output-area', 'children'),
+    [Output('output-area', 'children'),
+     Output('surface-params', 'data')],
     Input('calculate-button', 'n_clicks'),
     [State('data-choice', 'value'),
      State('stock-symbol', 'value'),
@@ -159,208 +251,240 @@ def calculate_option_price(n_clicks, choice, stock_symbol, strike_price_real, ex
                            underlying_price, strike_price_manual, time_to_expiry, risk_free_rate, volatility,
                            option_type_manual):
     if n_clicks is None:
-        return ""
+        return "", None
     
     if choice == 'real':
         # Validate inputs
         if not stock_symbol or not strike_price_real or not expiry_date:
-            return html.Div("Please fill in all required fields.", style={'color': 'red'})
+            return html.Div("Please fill in all required fields.", style={'color': 'red'}), None
         
         # Fetch and process real stock data
         try:
-            # Get stock data
-            stock_data = yf.Ticker(stock_symbol)
-            current_price = stock_data.history(period="1d")['Close'].iloc[-0]
+            # Get 1 year of (cached) stock data; the current price is its last close
+            with metrics.stage('data_fetch'):
+                hist_data = market_data.history(stock_symbol)
+                current_price = float(hist_data['Close'].iloc[-1])
             
             # Calculate time to expiry
             today = date.today()
             expiry = datetime.strptime(expiry_date, '%Y-%m-%d').date()
             days_to_expiry = (expiry - today).days
             if days_to_expiry <= 0:
-                return html.Div("Expiry date must be in the future.", style={'color': 'red'})
-            
-            T = days_to_expiry / 365.0  # Convert days to years
+                return html.Div("Expiry date must be in the future.", style={'color': 'red'}), None
             
-            # Get historical volatility (using 1 year of data)
-            hist_data = stock_data.history(period="1y")
-            returns = np.log(hist_data['Close'] / hist_data['Close'].shift(1))
-            sigma = returns.std() * np.sqrt(252)  # Annualized volatility
+            # Get historical volatility (using 1 year of data); only bars newer than the
+            # ones the tracker has already seen for this symbol are processed
+            with metrics.stage('vol_estimation'):
+                sigma = vol_tracker.update_series(stock_symbol.strip().upper(), hist_data['Close'])
             
             # Use a default risk-free rate (e.g., 10-year Treasury yield)
             r = 0.025  # 2.5% as an example
             
-            # Calculate option price
-            strike_price_real = float(strike_price_real)
-            if option_type_real == 'call':
-                option_price = bs_call(current_price, strike_price_real, T, r, sigma)
-            else:
-                option_price = bs_put(current_price, strike_price_real, T, r, sigma)
-            
-            # Generate price vs strike price graph data
-            strikes = np.linspace(current_price * 0.7, current_price * 1.3, 50)
-            call_prices = [bs_call(current_price, k, T, r, sigma) for k in strikes]
-            put_prices = [bs_put(current_price, k, T, r, sigma) for k in strikes]
-            
-            # Generate price vs time to expiry graph data
-            times = np.linspace(1/365, 2, 50)  # 1 day to 2 years
-            time_call_prices = [bs_call(current_price, strike_price_real, t, r, sigma) for t in times]
-            time_put_prices = [bs_put(current_price, strike_price_real, t, r, sigma) for t in times]
-            
-            # Format and return the result with visualizations
-            return html.Div([
-                html.Div([
-                    html.H3(f"{option_type_real.capitalize()} Option Price: ${option_price:.2f}", 
-                           style={'color': '#2c3e50', 'textAlign': 'center'}),
-                    html.Div([
-                        html.Div([
-                            html.P(f"Underlying Price (S): ${current_price:.2f}"),
-                            html.P(f"Strike Price (K): ${strike_price_real:.2f}"),
-                            html.P(f"Time to Expiry (T): {days_to_expiry} days"),
-                        ], style={'width': '50%', 'display': 'inline-block'}),
-                        html.Div([
-                            html.P(f"Risk-Free Rate (r): {r*100:.2f}%"),
-                            html.P(f"Volatility (σ): {sigma*100:.2f}%"),
-                            html.P(f"Option Type: {option_type_real.capitalize()}"),
-                        ], style={'width': '50%', 'display': 'inline-block'}),
-                    ], style={'backgroundColor': '#f8f9fa', 'padding': '15px', 'borderRadius': '5px'})
-                ]),
-                
-                html.Div([
-                    html.H4("Option Price vs Strike Price", style={'textAlign': 'center'}),
-                    dcc.Graph(
-                        figure={
-                            'data': [
-                                go.Scatter(x=strikes, y=call_prices, mode='lines', name='Call Price'),
-                                go.Scatter(x=strikes, y=put_prices, mode='lines', name='Put Price'),
-                                go.Scatter(x=[strike_price_real], y=[option_price], mode='markers', 
-                                          marker=dict(size=10, color='red'), name='Current Option')
-                            ],
-                            'layout': go.Layout(
-                                xaxis={'title': 'Strike Price'},
-                                yaxis={'title': 'Option Price'},
-                                margin={'l': 40, 'b': 40, 't': 10, 'r': 10},
-                                hovermode='closest'
-                            )
-                        }
-                    )
-                ]),
-                
-                html.Div([
-                    html.H4("Option Price vs Time to Expiry", style={'textAlign': 'center'}),
-                    dcc.Graph(
-                        figure={
-                            'data': [
-                                go.Scatter(x=[t*365 for t in times], y=time_call_prices, mode='lines', name='Call Price'),
-                                go.Scatter(x=[t*365 for t in times], y=time_put_prices, mode='lines', name='Put Price'),
-                                go.Scatter(x=[days_to_expiry], y=[option_price], mode='markers', 
-                                          marker=dict(size=10, color='red'), name='Current Option')
-                            ],
-                            'layout': go.Layout(
-                                xaxis={'title': 'Days to Expiry'},
-                                yaxis={'title': 'Option Price'},
-                                margin={'l': 40, 'b': 40, 't': 10, 'r': 10},
-                                hovermode='closest'
-                            )
-                        }
-                    )
-                ])
-            ])
+            # Listed single-stock options are American; early exercise matters for puts
+            params = (current_price, float(strike_price_real), days_to_expiry, r, sigma, option_type_real)
+            return render_result(*params, exercise='american'), surface_params(*params)
         except Exception as e:
-            return html.Div(f"An error occurred: {e}", style={'color': 'red'})
+            return html.Div(f"An error occurred: {e}", style={'color': 'red'}), None
     
     elif choice == 'manual':
         # Validate inputs
         if not underlying_price or not strike_price_manual or not time_to_expiry or not risk_free_rate or not volatility:
-            return html.Div("Please fill in all required fields.", style={'color': 'red'})
+            return html.Div("Please fill in all required fields.", style={'color': 'red'}), None
         
         # Process manual inputs
         try:
             S = float(underlying_price)
             K = float(strike_price_manual)
             T_days = float(time_to_expiry)
-            T = T_days / 365.0  # Convert days to years
             r = float(risk_free_rate) / 100.0  # Convert percentage to decimal
             sigma = float(volatility) / 100.0  # Convert percentage to decimal
             
-            # Calculate option price
-            if option_type_manual == 'call':
-                option_price = bs_call(S, K, T, r, sigma)
-            else:
-                option_price = bs_put(S, K, T, r, sigma)
-            
-            # Generate price vs strike price graph data
-            strikes = np.linspace(S * 0.7, S * 1.3, 50)
-            call_prices = [bs_call(S, k, T, r, sigma) for k in strikes]
-            put_prices = [bs_put(S, k, T, r, sigma) for k in strikes]
-            
-            # Generate price vs time to expiry graph data
-            times = np.linspace(1/365, 2, 50)  # 1 day to 2 years
-            time_call_prices = [bs_call(S, K, t, r, sigma) for t in times]
-            time_put_prices = [bs_put(S, K, t, r, sigma) for t in times]
-            
-            # Format and return the result with visualizations
-            return html.Div([
-                html.Div([
-                    html.H3(f"{option_type_manual.capitalize()} Option Price: ${option_price:.2f}", 
-                           style={'color': '#2c3e50', 'textAlign': 'center'}),
-                    html.Div([
-                        html.Div([
-                            html.P(f"Underlying Price (S): ${S:.2f}"),
-                            html.P(f"Strike Price (K): ${K:.2f}"),
-                            html.P(f"Time to Expiry (T): {T_days} days"),
-                        ], style={'width': '50%', 'display': 'inline-block'}),
-                        html.Div([
-                            html.P(f"Risk-Free Rate (r): {r*100:.2f}%"),
-                            html.P(f"Volatility (σ): {sigma*100:.2f}%"),
-                            html.P(f"Option Type: {option_type_manual.capitalize()}"),
-                        ], style={'width': '50%', 'display': 'inline-block'}),
-                    ], style={'backgroundColor': '#f8f9fa', 'padding': '15px', 'borderRadius': '5px'})
-                ]),
-                
-                html.Div([
-                    html.H4("Option Price vs Strike Price", style={'textAlign': 'center'}),
-                    dcc.Graph(
-                        figure={
-                            'data': [
-                                go.Scatter(x=strikes, y=call_prices, mode='lines', name='Call Price'),
-                                go.Scatter(x=strikes, y=put_prices, mode='lines', name='Put Price'),
-                                go.Scatter(x=[K], y=[option_price], mode='markers', 
-                                          marker=dict(size=10, color='red'), name='Current Option')
-                            ],
-                            'layout': go.Layout(
-                                xaxis={'title': 'Strike Price'},
-                                yaxis={'title': 'Option Price'},
-                                margin={'l': 40, 'b': 40, 't': 10, 'r': 10},
-                                hovermode='closest'
-                            )
-                        }
-                    )
-                ]),
-                
-                html.Div([
-                    html.H4("Option Price vs Time to Expiry", style={'textAlign': 'center'}),
-                    dcc.Graph(
-                        figure={
-                            'data': [
-                                go.Scatter(x=[t*365 for t in times], y=time_call_prices, mode='lines', name='Call Price'),
-                                go.Scatter(x=[t*365 for t in times], y=time_put_prices, mode='lines', name='Put Price'),
-                                go.Scatter(x=[T_days], y=[option_price], mode='markers', 
-                                          marker=dict(size=10, color='red'), name='Current Option')
-                            ],
-                            'layout': go.Layout(
-                                xaxis={'title': 'Days to Expiry'},
-                                yaxis={'title': 'Option Price'},
-                                margin={'l': 40, 'b': 40, 't': 10, 'r': 10},
-                                hovermode='closest'
-                            )
-                        }
-                    )
-                ])
-            ])
+            params = (S, K, T_days, r, sigma, option_type_manual)
+            return render_result(*params), surface_params(*params)
         except Exception as e:
-            return html.Div(f"An error occurred: {e}", style={'color': 'red'})
+            return html.Div(f"An error occurred: {e}", style={'color': 'red'}), None
     else:
-        return "Invalid data choice selected."
+        return "Invalid data choice selected.", None
+
+# Price the option and build both figures for one set of inputs. The whole
+# result is cached on (S, K, T, r, sigma, option type, exercise style), so
+# identical requests from any worker skip the pricing and the figure
+# construction.
+def price_and_plot(S, K, T_days, r, sigma, option_type, exercise='european'):
+    key = ('price_and_plot', RESULT_VERSION, S, K, T_days, r, sigma, option_type, exercise)
+    return result_cache.get_or_compute(key, lambda: _price_and_plot(S, K, T_days, r, sigma, option_type, exercise))
+
+def _price_and_plot(S, K, T_days, r, sigma, option_type, exercise='european'):
+    T = T_days / 365.0  # Convert days to years
+    with metrics.stage('pricing'):
+        call_price, put_price = bs_price(S, K, T, r, sigma)
+        option_price = float(call_price if option_type == 'call' else put_price)
+        
+        # Price vs strike price and price vs time to expiry, each in one vectorized call
+        strikes = np.linspace(S * 0.7, S * 1.3, 50)
+        call_prices, put_prices = bs_price(S, strikes, T, r, sigma)
+        times = np.linspace(1/365, 2, 50)  # 1 day to 2 years
+        time_call_prices, time_put_prices = bs_price(S, K, times, r, sigma)
+        
+        if exercise == 'american':
+            # Calls on a non-dividend-paying stock are never exercised early,
+            # so only the puts need the lattice. The curves are only plotted,
+            # so they use a coarser lattice than the headline price.
+            put_prices = american_price(S, strikes, T, r, sigma, call=False, steps=CURVE_LATTICE_STEPS)
+            time_put_prices = american_price(S, K, times, r, sigma, call=False, steps=CURVE_LATTICE_STEPS)
+            if option_type != 'call':
+                option_price = float(american_price(S, K, T, r, sigma, call=False))
+    
+    with metrics.stage('figures'):
+        return _build_figures(K, T_days, option_price, strikes, call_prices, put_prices,
+                              times, time_call_prices, time_put_prices)
+
+def _build_figures(K, T_days, option_price, strikes, call_prices, put_prices,
+                   times, time_call_prices, time_put_prices):
+    strike_figure = go.Figure(
+        data=[
+            go.Scatter(x=strikes, y=call_prices, mode='lines', name='Call Price'),
+            go.Scatter(x=strikes, y=put_prices, mode='lines', name='Put Price'),
+            go.Scatter(x=[K], y=[option_price], mode='markers', 
+                      marker=dict(size=10, color='red'), name='Current Option')
+        ],
+        layout=go.Layout(
+            xaxis={'title': 'Strike Price'},
+            yaxis={'title': 'Option Price'},
+            margin={'l': 40, 'b': 40, 't': 10, 'r': 10},
+            hovermode='closest'
+        )
+    ).to_dict()
+    
+    time_figure = go.Figure(
+        data=[
+            go.Scatter(x=times * 365, y=time_call_prices, mode='lines', name='Call Price'),
+            go.Scatter(x=times * 365, y=time_put_prices, mode='lines', name='Put Price'),
+            go.Scatter(x=[T_days], y=[option_price], mode='markers', 
+                      marker=dict(size=10, color='red'), name='Current Option')
+        ],
+        layout=go.Layout(
+            xaxis={'title': 'Days to Expiry'},
+            yaxis={'title': 'Option Price'},
+            margin={'l': 40, 'b': 40, 't': 10, 'r': 10},
+            hovermode='closest'
+        )
+    ).to_dict()
+    
+    return {'option_price': option_price, 'strike_figure': strike_figure, 'time_figure': time_figure}
+
+# Format the (possibly cached) result with its visualizations
+def render_result(S, K, T_days, r, sigma, option_type, exercise='european'):
+    result = price_and_plot(S, K, T_days, r, sigma, option_type, exercise)
+    return html.Div([
+        html.Div([
+            html.H3(f"{exercise.capitalize()} {option_type.capitalize()} Option Price: ${result['option_price']:.2f}", 
+                   style={'color': '#2c3e50', 'textAlign': 'center'}),
+            html.Div([
+                html.Div([
+                    html.P(f"Underlying Price (S): ${S:.2f}"),
+                    html.P(f"Strike Price (K): ${K:.2f}"),
+                    html.P(f"Time to Expiry (T): {T_days} days"),
+                ], style={'width': '50%', 'display': 'inline-block'}),
+                html.Div([
+                    html.P(f"Risk-Free Rate (r): {r*100:.2f}%"),
+                    html.P(f"Volatility (σ): {sigma*100:.2f}%"),
+                    html.P(f"Option Type: {option_type.capitalize()}"),
+                ], style={'width': '50%', 'display': 'inline-block'}),
+            ], style={'backgroundColor': '#f8f9fa', 'padding': '15px', 'borderRadius': '5px'})
+        ]),
+        
+        html.Div([
+            html.H4("Option Price vs Strike Price", style={'textAlign': 'center'}),
+            dcc.Graph(figure=result['strike_figure'])
+        ]),
+        
+        html.Div([
+            html.H4("Option Price vs Time to Expiry", style={'textAlign': 'center'}),
+            dcc.Graph(figure=result['time_figure'])
+        ])
+    ])
+
+# Inputs the surface depends on, stored client-side after each calculation.
+# The grid spans its own strikes and expiries, so the contract's K and T are
+# left out: changing only those re-renders nothing.
+def surface_params(S, K, T_days, r, sigma, option_type):
+    return {'S': S, 'r': r, 'sigma': sigma, 'option_type': option_type}
+
+# Callback for the strike x expiry surface. The figure is never re-sent:
+# each update is a Patch carrying only the properties that changed, so
+# switching the metric sends just the new z values, the strike axis is
+# re-sent only when the underlying price moves, and a new strike or expiry
+# for the same underlying, rate, volatility and type sends nothing.
+@app.callback(
+    [Output('surface-graph', 'figure'),
+     Output('surface-area', 'style'),
+     Output('surface-rendered', 'data')],
+    [Input('surface-params', 'data'),
+     Input('surface-metric', 'value')],
+    State('surface-rendered', 'data')
+)
+def update_surface(params, metric, rendered):
+    if not params:
+        return dash.no_update, {'display': 'none'}, None
+    
+    previous = (rendered or {}).get('params') or {}
+    metric_changed = not previous or rendered.get('metric') != metric
+    if not metric_changed and previous == params:
+        return dash.no_update, {'display': 'block'}, dash.no_update
+    
+    trace = Patch()
+    if not previous or previous['S'] != params['S']:
+        strikes, days = surface_axes(params['S'])
+        trace['data'][0]['x'] = typed_array(strikes)
+        trace['data'][0]['y'] = typed_array(days)
+    trace['data'][0]['z'] = surface_values(params, metric)
+    if metric_changed:
+        trace['data'][0]['colorbar']['title']['text'] = SURFACE_METRICS[metric][0]
+    return trace, {'display': 'block'}, {'params': params, 'metric': metric}
+
+def surface_axes(S):
+    strikes = np.linspace(S * 0.5, S * 1.5, SURFACE_STRIKES)
+    days = np.linspace(1, SURFACE_MAX_DAYS, SURFACE_EXPIRIES)
+    return strikes, days
+
+# One metric over the full strike x expiry grid, cached as an encoded typed array
+def surface_values(params, metric):
+    key = ('surface', SURFACE_VERSION, metric, params['S'], params['r'], params['sigma'], params['option_type'])
+    return surface_cache.get_or_compute(key, lambda: typed_array(surface_grids(params)[metric]))
+
+# Every metric's float32 grid for one surface, from a single broadcasted
+# bs_greeks call
+def surface_grids(params):
+    key = (params['S'], params['r'], params['sigma'], params['option_type'])
+    with _surface_grids_lock:
+        grids = _surface_grids.get(key)
+        if grids is not None:
+            _surface_grids.move_to_end(key)
+            return grids
+
+    strikes, days = surface_axes(params['S'])
+    with metrics.stage('surface'):
+        greeks = bs_greeks(params['S'], strikes[np.newaxis, :], days[:, np.newaxis] / 365.0,
+                           params['r'], params['sigma'], as_array=True)
+        column = 1 if params['option_type'] == 'call' else 2
+        grids = {metric: greeks[Greeks._fields.index(fields[column])].astype('<f4')
+                 for metric, fields in SURFACE_METRICS.items()}
+
+    with _surface_grids_lock:
+        _surface_grids[key] = grids
+        while len(_surface_grids) > SURFACE_GRIDS:
+            _surface_grids.popitem(last=False)
+    return grids
+
+# Plotly typed array: base64-encoded float32 values instead of a JSON list,
+# about a third of the payload for a 500 x 500 grid
+def typed_array(values):
+    values = np.ascontiguousarray(values, dtype='<f4')
+    spec = {'dtype': 'f4', 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+    if values.ndim > 1:
+        spec['shape'] = ', '.join(str(n) for n in values.shape)
+    return spec
 
 # Run the app
 if __name__ == '__main__':
@@ -0,0 +1,158 @@
+# Market data layer used by the CLI and the dashboard.
+#
+# MarketDataCache keeps one year of daily bars per symbol in an on-disk
+# columnar cache (Parquet, or pickle when pyarrow is not installed) with an
+# in-memory LRU in front of it. Entries older than the TTL are refreshed
+# incrementally: only bars from the last cached date onwards are requested
+# from the provider and merged into the cached series. Providers are plain
+# objects with a fetch(symbol, start=None, period="1y") method, so a
+# file-backed stand-in can replace yfinance in tests and offline use.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    _HAVE_PYARROW = True
+except ImportError:
+    _HAVE_PYARROW = False
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "BS_MARKET_DATA_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "black_scholes", "market_data"))
+DEFAULT_TTL = 15 * 60  # seconds
+
+# Length of history kept per symbol for each supported period
+_PERIODS = {"1mo": pd.Timedelta(days=31), "3mo": pd.Timedelta(days=92),
+            "6mo": pd.Timedelta(days=183), "1y": pd.Timedelta(days=365),
+            "2y": pd.Timedelta(days=730), "5y": pd.Timedelta(days=1826)}
+
+
+class MarketDataProvider:
+    # Return a DataFrame of daily bars indexed by date with at least a
+    # "Close" column. With start=None the whole period is returned,
+    # otherwise only bars dated on or after start.
+    def fetch(self, symbol, start=None, period="1y"):
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    def fetch(self, symbol, start=None, period="1y"):
+        import yfinance as yf
+
+        ticker = yf.Ticker(symbol)
+        if start is None:
+            return ticker.history(period=period)
+        return ticker.history(start=start.strftime("%Y-%m-%d"))
+
+
+class CSVProvider(MarketDataProvider):
+    # Local stand-in for yfinance: reads <directory>/<SYMBOL>.csv, whose first
+    # column is the bar date.
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, symbol, start=None, period="1y"):
+        path = os.path.join(self.directory, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        data = pd.read_csv(path, index_col=0, parse_dates=True).sort_index()
+        if start is None:
+            start = data.index[-1] - _PERIODS[period] if len(data) else None
+        return data if start is None else data[data.index >= start]
+
+
+class MarketDataCache:
+    def __init__(self, provider=None, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL,
+                 max_memory_entries=64, period="1y"):
+        if period not in _PERIODS:
+            raise ValueError(f"Unsupported period {period!r}; expected one of {sorted(_PERIODS)}")
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.period = period
+        self._memory = OrderedDict()  # symbol -> (fetched_at, frame)
+        self._lock = threading.Lock()
+        self.hits = 0  # served from memory or disk without asking the provider
+        self.misses = 0
+
+    # Daily bars for symbol covering the configured period
+    def history(self, symbol):
+        symbol = symbol.strip().upper()
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(symbol)
+            if entry is not None:
+                self._memory.move_to_end(symbol)
+                if now - entry[0] < self.ttl:
+                    self.hits += 1
+                    return entry[1]
+
+        fetched_at, frame = entry if entry is not None else self._load(symbol)
+        if frame is None or now - fetched_at >= self.ttl:
+            self.misses += 1
+            frame = self._refresh(symbol, frame)
+            fetched_at = now
+            self._store(symbol, frame)
+        else:
+            self.hits += 1
+
+        with self._lock:
+            self._memory[symbol] = (fetched_at, frame)
+            self._memory.move_to_end(symbol)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+        return frame
+
+    # Latest close, taken from the cached history rather than a second request
+    def current_price(self, symbol):
+        return float(self.history(symbol)["Close"].iloc[-1])
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    # Fetch only the bars from the last cached date onwards and merge them in.
+    # The last cached bar is requested again so an intraday bar gets updated.
+    def _refresh(self, symbol, cached):
+        if cached is None or cached.empty:
+            frame = self.provider.fetch(symbol, period=self.period)
+        else:
+            new = self.provider.fetch(symbol, start=cached.index[-1], period=self.period)
+            frame = pd.concat([cached, new]) if new is not None and not new.empty else cached
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            frame = frame[frame.index >= frame.index[-1] - _PERIODS[self.period]]
+        if frame is None or frame.empty:
+            raise ValueError(f"No price data returned for {symbol}")
+        return frame
+
+    def _path(self, symbol):
+        ext = "parquet" if _HAVE_PYARROW else "pkl"
+        return os.path.join(self.cache_dir, f"{symbol}_{self.period}.{ext}")
+
+    # Return (fetched_at, frame) from disk, using the file mtime as fetch time
+    def _load(self, symbol):
+        path = self._path(symbol)
+        try:
+            fetched_at = os.path.getmtime(path)
+            frame = pd.read_parquet(path) if _HAVE_PYARROW else pd.read_pickle(path)
+        except (OSError, ValueError):
+            return 0.0, None
+        return fetched_at, frame
+
+    # Write through a temporary file so concurrent readers never see a partial file
+    def _store(self, symbol, frame):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(symbol)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if _HAVE_PYARROW:
+            frame.to_parquet(tmp)
+        else:
+            frame.to_pickle(tmp)
+        os.replace(tmp, path)
@@ -0,0 +1,181 @@
+# In-process latency and request metrics for the dashboard server.
+#
+# Code records timings with `with REGISTRY.stage("pricing"): ...`, and
+# init_app(server) hooks the Flask app so every request is counted and
+# timed, serves everything in the Prometheus text format on /metrics, and
+# (optionally) saves a cProfile dump of any request slower than a
+# threshold. Metrics are per process; scrape every worker.
+
+import bisect
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_HELP = {
+    "bs_stage_duration_seconds": "Time spent in each stage of a pricing request.",
+    "bs_stage_errors_total": "Exceptions raised inside each stage.",
+    "bs_http_request_duration_seconds": "HTTP request latency by route.",
+    "bs_http_requests_total": "HTTP requests by route and status code.",
+    "bs_slow_request_profiles_total": "cProfile dumps written for slow requests.",
+    "bs_cache_hits_total": "Cache lookups served from the cache.",
+    "bs_cache_misses_total": "Cache lookups that had to compute or fetch.",
+    "bs_cache_hit_ratio": "Fraction of cache lookups served from the cache.",
+    "bs_api_contracts_total": "Contracts priced through the batch API.",
+    "bs_api_rejected_total": "Batch API requests rejected as invalid, too large or over the concurrency limit.",
+}
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}  # (name, labels) -> value
+        self._collectors = []
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # Time a block of code as one stage; exceptions are counted and re-raised
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("bs_stage_errors_total", stage=name)
+            raise
+        finally:
+            self.observe("bs_stage_duration_seconds", time.perf_counter() - start, stage=name)
+
+    # Register fn() -> iterable of (name, type, labels, value) samples read at
+    # scrape time, e.g. cache hit counters owned by other objects
+    def add_collector(self, fn):
+        self._collectors.append(fn)
+
+    def render(self):
+        families = {}  # name -> (type, [lines])
+
+        def add(name, kind, line):
+            families.setdefault(name, (kind, []))[1].append(line)
+
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = [(key, h.buckets, list(h.counts), h.sum, h.count)
+                          for key, h in self._histograms.items()]
+        for (name, labels), value in counters:
+            add(name, "counter", f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), buckets, counts, total, count in histograms:
+            cumulative = 0
+            for bound, n in zip(buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                add(name, "histogram", f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            add(name, "histogram", f"{name}_sum{_labels(labels)} {_number(total)}")
+            add(name, "histogram", f"{name}_count{_labels(labels)} {count}")
+        for collector in self._collectors:
+            for name, kind, labels, value in collector():
+                add(name, kind, f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+
+        lines = []
+        for name in sorted(families):
+            kind, samples = families[name]
+            if name in _HELP:
+                lines.append(f"# HELP {name} {_HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                    for k, v in labels)
+    return "{" + body + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Default registry shared by the dashboard modules
+REGISTRY = MetricsRegistry()
+
+
+# Instrument a Flask app: count and time every request, expose /metrics, and
+# when profile_slow_ms is set (or BS_PROFILE_SLOW_MS in the environment),
+# profile each request and keep the cProfile stats of those slower than the
+# threshold in profile_dir.
+def init_app(server, registry=REGISTRY, profile_slow_ms=None, profile_dir=None):
+    from flask import Response, g, request
+
+    if profile_slow_ms is None and os.environ.get("BS_PROFILE_SLOW_MS"):
+        profile_slow_ms = float(os.environ["BS_PROFILE_SLOW_MS"])
+    if profile_dir is None:
+        profile_dir = os.environ.get("BS_PROFILE_DIR", "slow_profiles")
+
+    @server.before_request
+    def _start_timer():
+        g.bs_request_start = time.perf_counter()
+        g.bs_profiler = None
+        if profile_slow_ms is not None:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already active in this process
+                return
+            g.bs_profiler = profiler
+
+    @server.after_request
+    def _record(response):
+        start = g.pop("bs_request_start", None)
+        profiler = g.pop("bs_profiler", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        registry.observe("bs_http_request_duration_seconds", elapsed, route=route)
+        registry.inc("bs_http_requests_total", route=route, status=str(response.status_code))
+
+        if profiler is not None:
+            profiler.disable()
+            if elapsed * 1000.0 >= profile_slow_ms:
+                os.makedirs(profile_dir, exist_ok=True)
+                name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms-{os.getpid()}-{threading.get_ident()}.prof"
+                profiler.dump_stats(os.path.join(profile_dir, name))
+                registry.inc("bs_slow_request_profiles_total", route=route)
+        return response
+
+    @server.route("/metrics")
+    def _metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    return server
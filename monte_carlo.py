@@ -0,0 +1,188 @@
+# Monte Carlo pricer under the same geometric Brownian motion assumptions
+# as the closed form, for validating bs_call / bs_put and for pricing
+# path-dependent payoffs off the same inputs.
+#
+# Paths are generated in chunks of chunk_size paths, so memory stays at
+# roughly chunk_size * n_steps * 16 bytes however many paths are requested.
+# The last chunk holds the remainder, so exactly n_paths paths are simulated
+# (rounded up to an even count with antithetic variates, and to whole
+# power-of-two replicates, usually within 1%, with Sobol points;
+# MCResult.n_paths reports the count).
+# Every chunk gets its own child of one SeedSequence (or its own Sobol
+# scramble), so results are reproducible for a given seed whatever the
+# number of workers. Each chunk returns running sums only, which are pooled
+# at the end:
+#   - antithetic variates pair every normal draw z with -z;
+#   - control variates use the closed form: the vanilla European payoff
+#     priced by bs_price for Asian and barrier options, and the discounted
+#     terminal spot (whose expectation is S) for European options, keeping
+#     the European estimate independent of the formula it validates;
+#   - with sobol=True each chunk is an independently scrambled Sobol
+#     replicate (SciPy required) and the standard error is taken across
+#     chunks.
+
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from BlackScholesPricingModel import bs_price
+
+MCResult = namedtuple("MCResult", ["price", "stderr", "n_paths"])
+
+KINDS = ("european", "asian", "barrier")
+BARRIER_TYPES = ("up-and-out", "up-and-in", "down-and-out", "down-and-in")
+DEFAULT_CHUNK_SIZE = 1 << 15
+MIN_SOBOL_CHUNK = 1 << 10
+
+# Per-chunk sums: n, sum y, sum y^2, sum c, sum c^2, sum y*c
+_N, _SY, _SYY, _SC, _SCC, _SYC = range(6)
+
+
+# Price one option by simulation. call selects the call or put payoff;
+# kind is "european", "asian" (arithmetic average of the n_steps monitoring
+# prices) or "barrier" (barrier_type knock-out/knock-in, monitored at the
+# n_steps dates). n_steps defaults to 1 for European options and to daily
+# monitoring (252 * T) otherwise.
+def mc_price(S, K, T, r, sigma, call=True, kind="european", barrier=None, barrier_type="up-and-out",
+             n_paths=1_000_000, n_steps=None, chunk_size=DEFAULT_CHUNK_SIZE, antithetic=True,
+             control_variate=True, sobol=False, workers=1, seed=None):
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+    if kind == "barrier":
+        if barrier is None:
+            raise ValueError("barrier options need a barrier level")
+        if barrier_type not in BARRIER_TYPES:
+            raise ValueError(f"barrier_type must be one of {BARRIER_TYPES}")
+    if n_paths < 2:
+        raise ValueError("n_paths must be at least 2")
+    if n_steps is None:
+        n_steps = 1 if kind == "european" else max(1, round(252 * T))
+    if sobol:
+        # Scrambled Sobol points are balanced in blocks of powers of two, and
+        # the replicates must be the same size for the standard error. Use
+        # smaller replicates (down to MIN_SOBOL_CHUNK) while whole ones
+        # would overshoot n_paths by more than 1%.
+        chunk_size = 1 << max(1, math.ceil(math.log2(min(chunk_size, n_paths))))
+        while chunk_size > MIN_SOBOL_CHUNK and -n_paths % chunk_size > n_paths // 100:
+            chunk_size //= 2
+        sizes = [chunk_size] * math.ceil(n_paths / chunk_size)
+    else:
+        if antithetic:
+            # Paths come in antithetic pairs
+            n_paths += n_paths % 2
+            chunk_size += chunk_size % 2
+        sizes = [chunk_size] * (n_paths // chunk_size)
+        if n_paths % chunk_size:
+            sizes.append(n_paths % chunk_size)
+
+    n_chunks = len(sizes)
+    params = dict(S=float(S), K=float(K), T=float(T), r=float(r), sigma=float(sigma), call=bool(call),
+                  kind=kind, barrier=barrier, barrier_type=barrier_type, n_steps=int(n_steps),
+                  antithetic=antithetic, sobol=sobol)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [(dict(params, n=size), s) for size, s in zip(sizes, seeds)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, n_chunks)) as pool:
+            sums = np.array(list(pool.map(_simulate_chunk, tasks)))
+    else:
+        sums = np.array([_simulate_chunk(task) for task in tasks])
+
+    control_mean = _control_mean(params) if control_variate else None
+    price, stderr = _estimate(sums, control_mean, per_chunk=sobol)
+    return MCResult(price, stderr, sum(sizes))
+
+
+# Expected value of the control variate
+def _control_mean(p):
+    if p["kind"] == "european":
+        return p["S"]
+    call, put = bs_price(p["S"], p["K"], p["T"], p["r"], p["sigma"])
+    return float(call if p["call"] else put)
+
+
+def _estimate(sums, control_mean, per_chunk):
+    total = sums.sum(axis=0)
+    n = total[_N]
+    mean_y = total[_SY] / n
+    var_y = (total[_SYY] - n * mean_y ** 2) / (n - 1)
+    beta = 0.0
+    if control_mean is not None:
+        mean_c = total[_SC] / n
+        var_c = (total[_SCC] - n * mean_c ** 2) / (n - 1)
+        cov = (total[_SYC] - n * mean_y * mean_c) / (n - 1)
+        beta = cov / var_c if var_c > 0 else 0.0
+        control_mean_shift = mean_c - control_mean
+    else:
+        control_mean_shift = 0.0
+    price = mean_y - beta * control_mean_shift
+
+    if per_chunk:
+        # Randomised QMC: each chunk is an independent replicate
+        if len(sums) < 2:
+            return float(price), float("nan")
+        estimates = sums[:, _SY] / sums[:, _N]
+        if control_mean is not None:
+            estimates -= beta * (sums[:, _SC] / sums[:, _N] - control_mean)
+        return float(price), float(np.std(estimates, ddof=1) / math.sqrt(len(sums)))
+
+    if control_mean is not None:
+        var_y = var_y - 2.0 * beta * cov + beta * beta * var_c
+    return float(price), float(math.sqrt(max(var_y, 0.0) / n))
+
+
+# Simulate one chunk and return its sums
+def _simulate_chunk(task):
+    p, seed = task
+    n, n_steps = p["n"], p["n_steps"]
+    draws = n // 2 if p["antithetic"] else n
+
+    if p["sobol"]:
+        from scipy.special import ndtri
+        from scipy.stats import qmc
+
+        u = qmc.Sobol(d=n_steps, scramble=True, seed=np.random.default_rng(seed)).random(draws)
+        z = ndtri(np.clip(u, 1e-16, 1.0 - 1e-16))
+    else:
+        z = np.random.default_rng(seed).standard_normal((draws, n_steps))
+    if p["antithetic"]:
+        z = np.concatenate((z, -z))
+
+    # Log-price paths built in place: increments, then cumulative sum along time
+    dt = p["T"] / n_steps
+    z *= p["sigma"] * math.sqrt(dt)
+    z += (p["r"] - 0.5 * p["sigma"] ** 2) * dt
+    np.cumsum(z, axis=1, out=z)
+    paths = np.exp(z, out=z)
+    paths *= p["S"]
+
+    discount = math.exp(-p["r"] * p["T"])
+    terminal = paths[:, -1]
+    sign = 1.0 if p["call"] else -1.0
+    vanilla = np.maximum(sign * (terminal - p["K"]), 0.0) * discount
+
+    if p["kind"] == "european":
+        y = vanilla
+        c = terminal * discount
+    elif p["kind"] == "asian":
+        y = np.maximum(sign * (paths.mean(axis=1) - p["K"]), 0.0) * discount
+        c = vanilla
+    else:
+        up = p["barrier_type"].startswith("up")
+        extreme = paths.max(axis=1) if up else paths.min(axis=1)
+        extreme = np.maximum(extreme, p["S"]) if up else np.minimum(extreme, p["S"])
+        hit = extreme >= p["barrier"] if up else extreme <= p["barrier"]
+        alive = ~hit if p["barrier_type"].endswith("out") else hit
+        y = vanilla * alive
+        c = vanilla
+
+    if p["antithetic"]:
+        # Average each antithetic pair into one sample
+        y = 0.5 * (y[:draws] + y[draws:])
+        c = 0.5 * (c[:draws] + c[draws:])
+    return np.array([len(y), y.sum(), y @ y, c.sum(), c @ c, y @ c])
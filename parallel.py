@@ -0,0 +1,98 @@
+# Multi-core pricing for large contract arrays.
+#
+# ParallelPricer copies the broadcast inputs once into a single
+# multiprocessing.shared_memory block laid out as seven rows of n float64
+# values (S, K, T, r, sigma, call, put). Pool workers attach to the block by
+# name and price their slice with bs_price(..., out=...) directly into the
+# output rows, so no array data is pickled between processes. Batches
+# smaller than min_parallel_size are priced in-process, where the pool and
+# shared memory overhead would dominate.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from BlackScholesPricingModel import bs_price
+
+DEFAULT_CHUNK_SIZE = 250_000
+DEFAULT_MIN_PARALLEL_SIZE = 500_000
+
+_ROWS = 7  # S, K, T, r, sigma, call, put
+
+
+# Runs in a pool worker: price columns [start, stop) of the shared block
+def _price_slice(name, n, start, stop):
+    # Pool workers share the parent's resource tracker, so attaching here does
+    # not hand ownership of the segment to the worker
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        block = np.ndarray((_ROWS, n), dtype=np.float64, buffer=shm.buf)
+        S, K, T, r, sigma = block[:5, start:stop]
+        bs_price(S, K, T, r, sigma, out=(block[5, start:stop], block[6, start:stop]))
+        del block, S, K, T, r, sigma
+    finally:
+        shm.close()
+    return stop - start
+
+
+class ParallelPricer:
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 min_parallel_size=DEFAULT_MIN_PARALLEL_SIZE):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_parallel_size = min_parallel_size
+        self._executor = None
+
+    # Same contract as bs_price: broadcast the inputs and return (call, put)
+    def price(self, S, K, T, r, sigma):
+        S, K, T, r, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+        shape = np.broadcast_shapes(S.shape, K.shape, T.shape, r.shape, sigma.shape)
+        n = int(np.prod(shape))
+        if self.workers <= 1 or n < self.min_parallel_size or n <= self.chunk_size:
+            return bs_price(S, K, T, r, sigma)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        shm = shared_memory.SharedMemory(create=True, size=_ROWS * n * 8)
+        try:
+            block = np.ndarray((_ROWS, n), dtype=np.float64, buffer=shm.buf)
+            for row, x in zip(block, (S, K, T, r, sigma)):
+                row.reshape(shape)[...] = x
+
+            starts = range(0, n, self.chunk_size)
+            futures = [self._executor.submit(_price_slice, shm.name, n, start,
+                                             min(start + self.chunk_size, n))
+                       for start in starts]
+            for future in futures:
+                future.result()
+
+            call = block[5].reshape(shape).copy()
+            put = block[6].reshape(shape).copy()
+            del block, row
+        finally:
+            shm.close()
+            shm.unlink()
+        return call, put
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# One-off convenience wrapper; keep a ParallelPricer around to reuse its pool
+def parallel_price(S, K, T, r, sigma, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                   min_parallel_size=DEFAULT_MIN_PARALLEL_SIZE):
+    with ParallelPricer(workers, chunk_size, min_parallel_size) as pricer:
+        return pricer.price(S, K, T, r, sigma)
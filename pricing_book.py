@@ -0,0 +1,172 @@
+# Live re-pricing book for tick-driven spot and volatility updates.
+#
+# Contracts are stored as a struct of float64 arrays sorted by underlying,
+# so every underlying owns one contiguous block of rows. Everything that
+# does not depend on spot is precomputed per contract (sigma * sqrt(T), the
+# drift term (r + sigma^2 / 2) * T - log K and the discounted strike), which
+# reduces a spot tick to one log per underlying plus a d1, two normal CDF
+# evaluations and a multiply-add per affected contract. A vol tick
+# refreshes the sigma-dependent terms of that underlying first.
+#
+# Updates are applied in batches: every underlying touched by the batch is
+# re-priced once, then a new read-only BookSnapshot is published, so readers
+# never see a half-applied batch. PricingBook.run() consumes Tick objects
+# from an asyncio.Queue, batching whatever has queued up since the last
+# re-price.
+
+import asyncio
+from collections import namedtuple
+
+import numpy as np
+
+from BlackScholesPricingModel import _norm_cdf
+
+# A spot and/or volatility update for one underlying; None leaves it unchanged
+Tick = namedtuple("Tick", ["underlying", "spot", "sigma"], defaults=(None, None))
+
+# Prices are in book order (grouped by underlying) and PricingBook.index maps
+# each book row back to its position in the constructor's inputs; spots line
+# up with PricingBook.underlyings. Both arrays are read-only copies.
+BookSnapshot = namedtuple("BookSnapshot", ["version", "prices", "spots"])
+
+
+class PricingBook:
+    def __init__(self, underlying, K, T, r, sigma, call, spots):
+        underlying = np.asarray(underlying)
+        n = underlying.shape[0]
+        K, T, r, sigma, call = (np.broadcast_to(np.asarray(x), (n,)) for x in (K, T, r, sigma, call))
+
+        self.underlyings, codes = np.unique(underlying, return_inverse=True)
+        self._code_of = {u: i for i, u in enumerate(self.underlyings.tolist())}
+        order = np.argsort(codes, kind="stable")
+        self.index = order
+        self.code = codes[order]
+        self._start = np.searchsorted(self.code, np.arange(len(self.underlyings)), side="left")
+        self._stop = np.searchsorted(self.code, np.arange(len(self.underlyings)), side="right")
+
+        # Per-contract terms that do not depend on spot
+        K, T, r = (np.asarray(x, dtype=float)[order] for x in (K, T, r))
+        self.K = K
+        self.T = T
+        self.r = r
+        self.sigma = np.asarray(sigma, dtype=float)[order].copy()
+        self.sign = np.where(np.asarray(call, dtype=bool)[order], 1.0, -1.0)
+        self.log_k = np.log(K)
+        self.sqrt_t = np.sqrt(T)
+        self.k_disc = K * np.exp(-r * T)
+        self.vol_sqrt_t = self.sigma * self.sqrt_t
+        # d1 = (log S + shift) / (sigma * sqrt(T))
+        self.shift = (r + 0.5 * self.sigma * self.sigma) * T - self.log_k
+
+        missing = [u for u in self._code_of if u not in spots]
+        if missing:
+            raise ValueError(f"No spot given for: {', '.join(map(str, missing))}")
+        self.spot = np.array([float(spots[u]) for u in self.underlyings.tolist()])
+        self.log_spot = np.log(self.spot)
+
+        self.prices = np.empty(n)
+        self._reprice(slice(None))
+        self.version = 0
+        self._subscribers = []
+        self.snapshot = None
+        self._publish()
+
+    # Book rows of the given underlying codes: a slice when they are
+    # contiguous, otherwise an index array
+    def _rows(self, codes):
+        if len(codes) == len(self.underlyings):
+            return slice(None)
+        if len(codes) == 1:
+            return slice(self._start[codes[0]], self._stop[codes[0]])
+        if len(codes) <= 8:
+            return np.concatenate([np.arange(self._start[c], self._stop[c]) for c in codes])
+        mask = np.zeros(len(self.underlyings), dtype=bool)
+        mask[codes] = True
+        return np.flatnonzero(mask[self.code])
+
+    def _reprice(self, rows):
+        vol_sqrt_t = self.vol_sqrt_t[rows]
+        sign = self.sign[rows]
+        code = self.code[rows]
+        d_1 = self.log_spot[code]
+        d_1 += self.shift[rows]
+        d_1 /= vol_sqrt_t
+        d_2 = d_1 - vol_sqrt_t
+        n_1, n_2 = np.split(_norm_cdf(np.concatenate((sign * d_1, sign * d_2))), 2)
+        n_1 *= self.spot[code]
+        n_2 *= self.k_disc[rows]
+        n_1 -= n_2
+        n_1 *= sign
+        self.prices[rows] = n_1
+
+    # Apply a batch of ticks, re-price every affected underlying once and
+    # publish a new snapshot, which is returned
+    def apply(self, ticks):
+        touched = set()
+        vol_codes = set()
+        for tick in ticks:
+            code = self._code_of.get(tick.underlying)
+            if code is None:
+                continue
+            if tick.spot is not None:
+                self.spot[code] = tick.spot
+                touched.add(code)
+            if tick.sigma is not None:
+                start, stop = self._start[code], self._stop[code]
+                self.sigma[start:stop] = tick.sigma
+                vol_codes.add(code)
+                touched.add(code)
+
+        if vol_codes:
+            rows = self._rows(sorted(vol_codes))
+            sigma = self.sigma[rows]
+            self.vol_sqrt_t[rows] = sigma * self.sqrt_t[rows]
+            self.shift[rows] = (self.r[rows] + 0.5 * sigma * sigma) * self.T[rows] - self.log_k[rows]
+        if touched:
+            codes = sorted(touched)
+            self.log_spot[codes] = np.log(self.spot[codes])
+            self._reprice(self._rows(codes))
+            self.version += 1
+            self._publish()
+        return self.snapshot
+
+    def _publish(self):
+        prices = self.prices.copy()
+        prices.flags.writeable = False
+        spots = self.spot.copy()
+        spots.flags.writeable = False
+        self.snapshot = BookSnapshot(self.version, prices, spots)
+        for queue in self._subscribers:
+            # Subscribers only ever need the latest snapshot
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(self.snapshot)
+
+    # Queue that always holds the most recent snapshot not yet read
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(self.snapshot)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.remove(queue)
+
+    # Consume ticks from queue until a None sentinel arrives. Every tick that
+    # has queued up while the previous batch was being priced is applied as
+    # one batch.
+    async def run(self, queue):
+        while True:
+            tick = await queue.get()
+            batch = []
+            while tick is not None:
+                batch.append(tick)
+                if queue.empty():
+                    break
+                tick = queue.get_nowait()
+            if batch:
+                self.apply(batch)
+            for _ in range(len(batch) + (tick is None)):
+                queue.task_done()
+            if tick is None:
+                return
@@ -0,0 +1,76 @@
+# Bounded cache of computed dashboard results shared across processes.
+#
+# Entries live in a local SQLite file, so every Dash worker process on the
+# machine sees the same cache, and the least recently used entries are
+# evicted once max_entries is exceeded. Keys are tuples of plain values
+# (for example (S, K, T, r, sigma, option type)); values are anything that
+# pickles.
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get(
+    "BS_RESULT_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "black_scholes", "results.sqlite"))
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    # sqlite3 connections cannot be shared between threads, so each thread
+    # opens its own
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS results "
+                         "(key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def get(self, key, default=None):
+        digest = self._digest(key)
+        conn = self._connection()
+        row = conn.execute("SELECT value FROM results WHERE key = ?", (digest,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), digest))
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key, value):
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+                     (self._digest(key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time()))
+        conn.execute("DELETE FROM results WHERE key NOT IN "
+                     "(SELECT key FROM results ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+
+    # Return the cached value for key, computing and storing it on a miss
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        self._connection().execute("DELETE FROM results")
@@ -0,0 +1,136 @@
+# Scenario grids and PnL ladders for a portfolio of European options.
+#
+# A ScenarioGrid is the outer product of spot, vol, rate and time shocks:
+#   spot  relative spot moves, S' = S * (1 + shock)
+#   vol   absolute volatility shifts, sigma' = sigma + shock (floored at MIN_SIGMA)
+#   rate  absolute rate shifts, r' = r + shock
+#   days  calendar days elapsed, T' = T - days / 365 (expired contracts are
+#         worth their intrinsic value)
+# so e.g. 41 spot x 21 vol x 5 day shocks is M = 4,305 scenarios.
+#
+# scenario_pnl revalues every position under every scenario with bs_price,
+# broadcasting a block of positions against a block of scenarios at a time.
+# Blocks hold at most chunk_elements (position, scenario) pairs and reuse
+# the same output buffers, so memory stays bounded by the block size rather
+# than by N x M. Each block is folded into the aggregates as it is priced;
+# the full N x M PnL is only kept with full=True.
+
+from collections import namedtuple
+
+import numpy as np
+
+from BlackScholesPricingModel import bs_price
+
+ScenarioGrid = namedtuple("ScenarioGrid", ["spot", "vol", "rate", "days"], defaults=((0.0,),) * 4)
+
+# portfolio and by_underlying are shaped like the grid, (spot, vol, rate,
+# days), with by_underlying indexed by underlyings first. worst, best and
+# worst_scenario are per position, worst_scenario as a flat scenario index
+# (np.unravel_index(i, grid_shape) gives the grid coordinates). pnl is the
+# full (N, spot, vol, rate, days) PnL when requested, otherwise None.
+ScenarioResult = namedtuple("ScenarioResult", [
+    "grid_shape", "portfolio", "underlyings", "by_underlying", "worst", "best", "worst_scenario", "pnl",
+])
+
+DEFAULT_CHUNK_ELEMENTS = 1 << 21
+MIN_SIGMA = 1e-4
+MIN_T = 1e-10
+
+
+# Flattened scenario columns (ds, dv, dr, dt in years) in C order of the grid
+def grid_columns(grid):
+    axes = [np.asarray(a, dtype=float).ravel() for a in grid]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    shape = tuple(len(a) for a in axes)
+    ds, dv, dr, days = (m.ravel() for m in mesh)
+    return shape, ds, dv, dr, days / 365.0
+
+
+# PnL of quantity units of each position under every scenario of grid,
+# relative to its current value. S, K, T, r, sigma, call, quantity and
+# underlying are per position (scalars broadcast); positions with no
+# underlying label all count as one underlying.
+def scenario_pnl(S, K, T, r, sigma, grid, call=True, quantity=1.0, underlying=None,
+                 chunk_elements=DEFAULT_CHUNK_ELEMENTS, full=False):
+    S, K, T, r, sigma, quantity = (np.atleast_1d(np.asarray(x, dtype=float)) for x in (S, K, T, r, sigma, quantity))
+    call = np.atleast_1d(np.asarray(call, dtype=bool))
+    n = np.broadcast_shapes(S.shape, K.shape, T.shape, r.shape, sigma.shape, call.shape, quantity.shape)[0]
+    S, K, T, r, sigma, quantity, call = (np.broadcast_to(x, (n,)) for x in (S, K, T, r, sigma, quantity, call))
+    if underlying is None:
+        underlyings, codes = np.array([None], dtype=object), np.zeros(n, dtype=np.intp)
+    else:
+        underlyings, codes = np.unique(np.broadcast_to(np.asarray(underlying), (n,)), return_inverse=True)
+
+    # Process positions grouped by underlying so each block folds into the
+    # per-underlying sums with one reduceat over contiguous runs
+    order = np.argsort(codes, kind="stable")
+    S, K, T, r, sigma, quantity, call, codes = (x[order] for x in (S, K, T, r, sigma, quantity, call, codes))
+
+    grid_shape, ds, dv, dr, dt = grid_columns(grid)
+    m = len(ds)
+    base_call, base_put = bs_price(S, K, T, r, sigma)
+    base = np.where(call, base_call, base_put)
+
+    portfolio = np.zeros(m)
+    by_underlying = np.zeros((len(underlyings), m))
+    worst = np.empty(n)
+    best = np.empty(n)
+    worst_scenario = np.empty(n, dtype=np.intp)
+    pnl_all = np.empty((n, m)) if full else None
+
+    # Block sizes: as many whole scenario rows per block as fit, otherwise
+    # one position at a time against a slice of the scenarios
+    rows = max(1, min(n, chunk_elements // m))
+    cols = min(m, max(1, chunk_elements))
+    call_buf = np.empty(rows * cols)
+    put_buf = np.empty(rows * cols)
+
+    spot_factor = 1.0 + ds
+    for start in range(0, n, rows):
+        p = slice(start, min(n, start + rows))
+        block_codes = codes[p]
+        runs = np.flatnonzero(np.r_[True, block_codes[1:] != block_codes[:-1]])
+        put_rows = ~call[p, None]
+        for col_start in range(0, m, cols):
+            s = slice(col_start, min(m, col_start + cols))
+            shape = (p.stop - p.start, s.stop - s.start)
+            size = shape[0] * shape[1]
+            out = (call_buf[:size].reshape(shape), put_buf[:size].reshape(shape))
+
+            S_s = S[p, None] * spot_factor[None, s]
+            sigma_s = np.maximum(sigma[p, None] + dv[None, s], MIN_SIGMA)
+            r_s = r[p, None] + dr[None, s]
+            T_s = np.maximum(T[p, None] - dt[None, s], MIN_T)
+            pnl, put_values = bs_price(S_s, K[p, None], T_s, r_s, sigma_s, out=out)
+            np.copyto(pnl, put_values, where=put_rows)
+            pnl -= base[p, None]
+            pnl *= quantity[p, None]
+
+            if full:
+                pnl_all[p, s] = pnl
+            block_worst = pnl.argmin(axis=1)
+            block_min = pnl[np.arange(shape[0]), block_worst]
+            block_max = pnl.max(axis=1)
+            if col_start == 0:
+                worst[p], best[p], worst_scenario[p] = block_min, block_max, block_worst
+            else:
+                lower = block_min < worst[p]
+                worst[p] = np.where(lower, block_min, worst[p])
+                worst_scenario[p] = np.where(lower, block_worst + col_start, worst_scenario[p])
+                best[p] = np.maximum(best[p], block_max)
+
+            sums = np.add.reduceat(pnl, runs, axis=0)
+            by_underlying[block_codes[runs], s] += sums
+            portfolio[s] += sums.sum(axis=0)
+
+    # Back to the caller's position order
+    unsort = np.empty(n, dtype=np.intp)
+    unsort[order] = np.arange(n)
+    worst, best, worst_scenario = worst[unsort], best[unsort], worst_scenario[unsort]
+    if full:
+        pnl_all = pnl_all[unsort]
+
+    return ScenarioResult(
+        grid_shape, portfolio.reshape(grid_shape), underlyings, by_underlying.reshape((-1,) + grid_shape),
+        worst, best, worst_scenario, None if pnl_all is None else pnl_all.reshape((n,) + grid_shape),
+    )
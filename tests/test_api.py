@@ -0,0 +1,121 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import Greeks, bs_greeks, bs_price, implied_vol
+
+flask = pytest.importorskip("flask")
+
+from api import ARROW, NPZ, register_api  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    server = flask.Flask(__name__)
+    register_api(server, max_bytes=1 << 20, max_contracts=1000, max_concurrent=2)
+    return server.test_client()
+
+
+def _contracts(n=50, seed=11):
+    rng = np.random.default_rng(seed)
+    return {"S": rng.uniform(80.0, 120.0, n), "K": rng.uniform(80.0, 120.0, n), "T": 0.5, "r": 0.03,
+            "sigma": rng.uniform(0.1, 0.5, n)}
+
+
+def _json(columns):
+    return {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in columns.items()}
+
+
+def test_price_json(client):
+    inputs = _contracts()
+    response = client.post("/api/v1/price", json=_json(inputs))
+    assert response.status_code == 200
+    call, put = bs_price(**inputs)
+    np.testing.assert_allclose(response.get_json()["call"], call, rtol=1e-14)
+    np.testing.assert_allclose(response.get_json()["put"], put, rtol=1e-14)
+
+
+def test_greeks_selected_fields(client):
+    inputs = _contracts()
+    response = client.post("/api/v1/greeks?fields=delta_call,gamma", json=_json(inputs))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert set(body) == {"delta_call", "gamma"}
+    greeks = bs_greeks(**inputs)
+    np.testing.assert_allclose(body["gamma"], greeks.gamma, rtol=1e-14)
+
+    response = client.post("/api/v1/greeks", json=_json(inputs))
+    assert set(response.get_json()) == set(Greeks._fields)
+    response = client.post("/api/v1/greeks?fields=delta,gamma", json=_json(inputs))
+    assert response.status_code == 400
+    assert "delta" in response.get_json()["error"]
+
+
+# Quotes outside the no-arbitrage bounds come back as null in JSON
+def test_implied_vol_json(client):
+    inputs = _contracts()
+    call, put = bs_price(**inputs)
+    is_call = np.arange(len(call)) % 2 == 0
+    quotes = np.where(is_call, call, put)
+    quotes[0] = 500.0
+    body = dict(_json(inputs), price=quotes.tolist(), call=is_call.tolist())
+    del body["sigma"]
+    response = client.post("/api/v1/implied_vol", json=body)
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result["sigma"][0] is None and result["converged"][0] is False
+    expected, _ = implied_vol(quotes, inputs["S"], inputs["K"], 0.5, 0.03, is_call)
+    np.testing.assert_allclose(result["sigma"][1:], expected[1:], rtol=1e-12)
+    np.testing.assert_allclose(result["sigma"][1:], inputs["sigma"][1:], atol=1e-6)
+
+
+def test_npz_round_trip_and_accept(client):
+    inputs = _contracts()
+    buffer = io.BytesIO()
+    np.savez(buffer, **inputs)
+    response = client.post("/api/v1/price", data=buffer.getvalue(), content_type=NPZ)
+    assert response.status_code == 200 and response.mimetype == NPZ
+    with np.load(io.BytesIO(response.data)) as result:
+        np.testing.assert_array_equal(result["call"], bs_price(**inputs)[0])
+
+    response = client.post("/api/v1/price", data=buffer.getvalue(), content_type=NPZ,
+                           headers={"Accept": "application/json"})
+    assert response.mimetype == "application/json"
+    np.testing.assert_allclose(response.get_json()["put"], bs_price(**inputs)[1], rtol=1e-14)
+
+
+def test_arrow_round_trip(client):
+    pa = pytest.importorskip("pyarrow")
+    inputs = {k: np.broadcast_to(v, (50,)) for k, v in _contracts().items()}
+    table = pa.table(inputs)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    response = client.post("/api/v1/price", data=sink.getvalue().to_pybytes(), content_type=ARROW)
+    assert response.status_code == 200 and response.mimetype == ARROW
+    result = pa.ipc.open_stream(response.data).read_all()
+    np.testing.assert_array_equal(result.column("call").to_numpy(), bs_price(**inputs)[0])
+
+
+@pytest.mark.parametrize("body, status, message", [
+    ({"S": 100.0, "K": 100.0, "T": 0.5, "r": 0.03}, 400, "Missing inputs: sigma"),
+    ({"S": [100.0, 101.0], "K": [100.0, 101.0, 102.0], "T": 0.5, "r": 0.03, "sigma": 0.2}, 400, "different lengths"),
+    ({"S": "abc", "K": 100.0, "T": 0.5, "r": 0.03, "sigma": 0.2}, 400, "S must be numeric"),
+    ({"S": [[100.0]], "K": 100.0, "T": 0.5, "r": 0.03, "sigma": 0.2}, 400, "1-D"),
+    ({"S": [100.0] * 1001, "K": 100.0, "T": 0.5, "r": 0.03, "sigma": 0.2}, 413, "At most 1000"),
+    ([1, 2, 3], 400, "object of columns"),
+])
+def test_invalid_requests(client, body, status, message):
+    response = client.post("/api/v1/price", json=body)
+    assert response.status_code == status
+    assert message in response.get_json()["error"]
+
+
+def test_body_limits(client):
+    response = client.post("/api/v1/price", data=b"", content_type="application/json")
+    assert response.status_code == 400
+    response = client.post("/api/v1/price", data=json.dumps({"S": [100.0] * 200_000}),
+                           content_type="application/json")
+    assert response.status_code == 413
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from batch_pricing import price_file
+
+
+# CSV chunks infer their own dtypes; the Parquet output must still take
+# columns that are empty at first or that gain missing values later
+def test_parquet_output_survives_dtype_changes_between_chunks(tmp_path):
+    n = 300
+    lines = ["S,K,T,r,sigma,notes,qty"]
+    for i in range(n):
+        notes = "hedge" if i >= 250 else ""
+        qty = "" if i == 220 else str(i % 7 + 1)
+        lines.append(f"100,{80 + i % 40},0.5,0.03,0.2,{notes},{qty}")
+    source = tmp_path / "in.csv"
+    source.write_text("\n".join(lines) + "\n")
+
+    rows = price_file(source, tmp_path / "out.parquet", chunk_size=100, progress=None)
+    out = pd.read_parquet(tmp_path / "out.parquet")
+    assert rows == len(out) == n
+    assert out["notes"].iloc[-1] == "hedge" and out["notes"].iloc[:250].isna().all()
+    assert out["qty"].isna().sum() == 1
+    assert np.isfinite(out["call"]).all()
+
+
+def test_incompatible_dtype_change_is_reported(tmp_path):
+    lines = ["S,K,T,r,sigma,qty"] + [f"100,100,0.5,0.03,0.2,{1.5 if i == 150 else 1}" for i in range(200)]
+    source = tmp_path / "in.csv"
+    source.write_text("\n".join(lines) + "\n")
+    with pytest.raises(ValueError, match="qty"):
+        price_file(source, tmp_path / "out.parquet", chunk_size=100, progress=None)
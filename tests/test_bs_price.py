@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import bs_call, bs_price, bs_put
+
+
+def _contracts(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(50.0, 150.0, n), rng.uniform(50.0, 150.0, n), rng.uniform(0.01, 2.0, n),
+            rng.uniform(-0.01, 0.08, n), rng.uniform(0.05, 0.8, n))
+
+
+# One contract at a time goes through the math-module path; it must agree
+# with the broadcast path contract by contract
+def test_scalar_path_matches_array_path():
+    S, K, T, r, sigma = _contracts()
+    call, put = bs_price(S, K, T, r, sigma)
+    scalar = np.array([bs_price(*(float(x[i]) for x in (S, K, T, r, sigma))) for i in range(len(S))])
+    np.testing.assert_allclose(scalar[:, 0], call, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(scalar[:, 1], put, rtol=1e-9, atol=1e-12)
+    assert bs_call(S[0], K[0], T[0], r[0], sigma[0]) == pytest.approx(call[0], rel=1e-12)
+    assert bs_put(np.array(S[0]), K[0], T[0], r[0], sigma[0]) == pytest.approx(put[0], rel=1e-12)
+
+
+# Inputs the math module rejects fall back to the array path's results
+@pytest.mark.parametrize("args", [
+    (100.0, 100.0, 0.0, 0.03, 0.2),
+    (100.0, 90.0, 1.0, 0.03, 0.0),
+    (-1.0, 100.0, 1.0, 0.03, 0.2),
+    (100.0, 100.0, 1.0, -800.0, 0.2),
+])
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_scalar_edge_cases_match_array_path(args):
+    scalar = bs_price(*args)
+    array = bs_price(*(np.array([x]) for x in args))
+    np.testing.assert_array_equal(np.array(scalar), np.concatenate(array))
+    assert np.ndim(scalar[0]) == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import Greeks, bs_greeks, bs_price
+
+
+def _contracts(n=500, seed=3):
+    rng = np.random.default_rng(seed)
+    S = rng.uniform(60.0, 140.0, n)
+    K = rng.uniform(60.0, 140.0, n)
+    T = rng.uniform(0.1, 2.0, n)
+    r = rng.uniform(-0.01, 0.08, n)
+    sigma = rng.uniform(0.1, 0.8, n)
+    return S, K, T, r, sigma
+
+
+# Central difference of field (a function of the inputs) along one input
+def _diff(field, args, name, h):
+    index = "SKTrs".index(name)
+    up, down = list(args), list(args)
+    up[index] = args[index] + h
+    down[index] = args[index] - h
+    return (field(*up) - field(*down)) / (2.0 * h)
+
+
+def _price(i):
+    return lambda *args: bs_price(*args)[i]
+
+
+def _field(name):
+    return lambda *args: getattr(bs_greeks(*args), name)
+
+
+# Each Greek against a central difference of the price (or of delta / vega for
+# the second-order ones). Theta, charm and veta are derivatives in calendar
+# time, i.e. minus the derivative in T.
+@pytest.mark.parametrize("greek, of, wrt, sign", [
+    ("delta_call", _price(0), "S", 1.0),
+    ("delta_put", _price(1), "S", 1.0),
+    ("gamma", _field("delta_call"), "S", 1.0),
+    ("vega", _price(0), "s", 1.0),
+    ("theta_call", _price(0), "T", -1.0),
+    ("theta_put", _price(1), "T", -1.0),
+    ("rho_call", _price(0), "r", 1.0),
+    ("rho_put", _price(1), "r", 1.0),
+    ("vanna", _field("delta_call"), "s", 1.0),
+    ("vomma", _field("vega"), "s", 1.0),
+    ("charm", _field("delta_call"), "T", -1.0),
+    ("veta", _field("vega"), "T", -1.0),
+])
+def test_matches_finite_differences(greek, of, wrt, sign):
+    args = _contracts()
+    h = {"S": 1e-3, "T": 1e-5, "r": 1e-5, "s": 1e-5}[wrt]
+    expected = sign * _diff(of, args, wrt, h)
+    np.testing.assert_allclose(getattr(bs_greeks(*args), greek), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_prices_match_bs_price():
+    args = _contracts()
+    greeks = bs_greeks(*args)
+    call, put = bs_price(*args)
+    np.testing.assert_allclose(greeks.call, call, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(greeks.put, put, rtol=1e-12, atol=1e-12)
+
+
+def test_array_block_and_scalars():
+    args = _contracts(n=10)
+    block = bs_greeks(*args, as_array=True)
+    assert block.shape == (len(Greeks._fields), 10)
+    np.testing.assert_array_equal(block, np.array(bs_greeks(*args)))
+    scalar = bs_greeks(*(x[0] for x in args))
+    assert np.ndim(scalar.gamma) == 0
+    assert scalar.gamma == pytest.approx(block[Greeks._fields.index("gamma"), 0], rel=1e-14)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import bs_greeks, bs_price, implied_vol
+
+
+def _chain(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    K = rng.uniform(60.0, 140.0, n)
+    T = rng.uniform(0.05, 2.0, n)
+    sigma = rng.uniform(0.05, 1.0, n)
+    call = rng.random(n) < 0.5
+    c, p = bs_price(100.0, K, T, 0.03, sigma)
+    return K, T, sigma, call, np.where(call, c, p)
+
+
+def _reprice(sigma, K, T, call):
+    c, p = bs_price(100.0, K, T, 0.03, sigma)
+    return np.where(call, c, p)
+
+
+def test_recovers_sigma_on_random_chain():
+    K, T, sigma, call, quotes = _chain()
+    implied, converged = implied_vol(quotes, 100.0, K, T, 0.03, call)
+    assert converged.mean() > 0.98
+    # Wherever vega is not negligible the volatility itself is pinned down
+    vega = bs_greeks(100.0, K, T, 0.03, sigma).vega
+    sensitive = converged & (vega > 1.0)
+    np.testing.assert_allclose(implied[sensitive], sigma[sensitive], rtol=0, atol=1e-6)
+
+
+# A converged flag must mean the quote is reproduced, also when the solver is
+# cut short (it used to report bracket midpoints as converged)
+@pytest.mark.parametrize("max_iter", [1, 2, 3, 20])
+def test_converged_reproduces_quote(max_iter):
+    K, T, sigma, call, quotes = _chain()
+    implied, converged = implied_vol(quotes, 100.0, K, T, 0.03, call, max_iter=max_iter)
+    repriced = _reprice(implied[converged], K[converged], T[converged], call[converged])
+    np.testing.assert_allclose(repriced, quotes[converged], rtol=1e-8, atol=1e-10)
+
+
+def test_out_of_bounds_quotes_are_nan():
+    # Call above the spot, call below intrinsic, put above the discounted strike, negative price
+    quotes = np.array([150.0, 1e-3, 120.0, -1.0])
+    K = np.array([100.0, 50.0, 100.0, 100.0])
+    call = np.array([True, True, False, False])
+    implied, converged = implied_vol(quotes, 100.0, K, 1.0, 0.03, call)
+    assert np.isnan(implied).all()
+    assert not converged.any()
+
+
+# The root lies above sigma_max, so bisection collapses the bracket onto
+# sigma_max; that midpoint used to be reported as converged
+def test_root_outside_bracket_is_not_converged():
+    call, _ = bs_price(100.0, 100.0, 1.0, 0.03, 6.0)
+    implied, converged = implied_vol(call, 100.0, 100.0, 1.0, 0.03, True, sigma_max=4.0)
+    assert not converged
+    assert implied == pytest.approx(4.0)
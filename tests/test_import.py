@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# The pricing core must stay importable with NumPy alone; the heavy market
+# data and SciPy dependencies belong to the paths that actually use them
+def test_pricing_module_imports_only_numpy():
+    code = ("import sys, BlackScholesPricingModel; "
+            "print(','.join(m for m in ('scipy', 'pandas', 'yfinance', 'pandas_datareader') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
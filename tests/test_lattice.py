@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import bs_price
+from lattice import american_price
+
+
+@pytest.mark.parametrize("steps", [1, 3, 101])
+def test_richardson_needs_even_steps(steps):
+    with pytest.raises(ValueError, match="even"):
+        american_price(100.0, 105.0, 1.0, 0.05, 0.25, call=False, steps=steps)
+    american_price(100.0, 105.0, 1.0, 0.05, 0.25, call=False, steps=steps, richardson=False)
+
+
+def _contracts():
+    S = np.array([100.0, 100.0, 100.0, 80.0, 120.0])
+    K = np.array([105.0, 90.0, 100.0, 100.0, 100.0])
+    T = np.array([1.0, 0.25, 2.0, 0.5, 1.5])
+    r = np.array([0.05, 0.03, 0.08, 0.02, 0.04])
+    sigma = np.array([0.25, 0.4, 0.2, 0.3, 0.35])
+    q = np.array([0.0, 0.0, 0.0, 0.03, 0.05])
+    # Every contract as a put and as a call
+    return [np.tile(x, 2) for x in (S, K, T, r, sigma, q)] + [np.repeat([False, True], 5)]
+
+
+@pytest.fixture(scope="module")
+def converged():
+    S, K, T, r, sigma, q, call = _contracts()
+    return american_price(S, K, T, r, sigma, call=call, q=q, steps=10_000)
+
+
+# The default 500 steps, with smoothing and Richardson extrapolation, land
+# within 1e-3 of a 10,000-step lattice on both lattice types
+@pytest.mark.parametrize("method", ["binomial", "trinomial"])
+def test_matches_converged_lattice(converged, method):
+    S, K, T, r, sigma, q, call = _contracts()
+    price = american_price(S, K, T, r, sigma, call=call, q=q, method=method)
+    np.testing.assert_allclose(price, converged, rtol=0, atol=1e-3)
+    # Raw lattices converge too, only more slowly
+    raw = american_price(S, K, T, r, sigma, call=call, q=q, method=method, smoothing=False, richardson=False)
+    np.testing.assert_allclose(raw, converged, rtol=0, atol=5e-3)
+
+
+def test_bounds_and_early_exercise(converged):
+    S, K, T, r, sigma, q, call = _contracts()
+    european_call, european_put = bs_price(S * np.exp(-q * T), K, T, r, sigma)
+    european = np.where(call, european_call, european_put)
+    # Calls without dividends are never exercised early: exactly the closed form
+    no_early = call & (q == 0)
+    np.testing.assert_array_equal(converged[no_early], european[no_early])
+    assert (converged >= european - 1e-10).all()
+    assert (converged >= np.where(call, S - K, K - S)).all()
+    # The early exercise premium of a put is worth something
+    assert (converged[~call] - european[~call] > 1e-3).all()
+
+
+def test_scalar_and_broadcast_shapes():
+    scalar = american_price(100.0, 105.0, 1.0, 0.05, 0.25, call=False)
+    assert np.ndim(scalar) == 0
+    grid = american_price(100.0, np.array([95.0, 105.0])[:, None], np.array([0.5, 1.0, 2.0]), 0.05, 0.25, call=False)
+    assert grid.shape == (2, 3)
+    assert grid[1, 1] == pytest.approx(scalar, rel=1e-12)
@@ -0,0 +1,28 @@
+import pytest
+
+from BlackScholesPricingModel import bs_price
+from monte_carlo import mc_price
+
+
+# The requested path count is what runs, whatever the chunk size
+@pytest.mark.parametrize("n_paths, antithetic, expected", [
+    (10, True, 10),
+    (11, True, 12),
+    (200_000, True, 200_000),
+    (200_001, False, 200_001),
+])
+def test_simulates_requested_paths(n_paths, antithetic, expected):
+    result = mc_price(100.0, 105.0, 0.5, 0.03, 0.2, n_paths=n_paths, antithetic=antithetic,
+                      chunk_size=1 << 15, seed=1)
+    assert result.n_paths == expected
+    call, _ = bs_price(100.0, 105.0, 0.5, 0.03, 0.2)
+    assert abs(result.price - call) < 5 * result.stderr
+
+
+def test_sobol_rounds_to_whole_replicates():
+    pytest.importorskip("scipy")
+    result = mc_price(100.0, 105.0, 0.5, 0.03, 0.2, n_paths=200_000, sobol=True, seed=1)
+    assert 200_000 <= result.n_paths <= 202_000
+    assert result.n_paths % 1024 == 0
+    call, _ = bs_price(100.0, 105.0, 0.5, 0.03, 0.2)
+    assert abs(result.price - call) < 5 * result.stderr
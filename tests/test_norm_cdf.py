@@ -0,0 +1,37 @@
+import math
+
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import _norm_cdf, _norm_cdf_pair
+
+
+def _reference(x):
+    return np.array([0.5 * math.erfc(-v / math.sqrt(2.0)) for v in x])
+
+
+# Cover all three of Cody's regions and their boundaries, deep into the tails
+def test_matches_erfc_to_double_precision():
+    x = np.concatenate((np.linspace(-37.0, 37.0, 20001), [-5.656854249492380, -0.67448975, 0.67448975, 5.656854249492380]))
+    lower, upper = _norm_cdf_pair(x)
+    np.testing.assert_allclose(lower, _reference(x), rtol=1e-12, atol=0)
+    np.testing.assert_allclose(upper, _reference(-x), rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize("x, expected", [
+    (0.0, 0.5),
+    (-1.0, 0.15865525393145707),
+    (2.0, 0.9772498680518208),
+    (-5.0, 2.866515718791946e-07),
+    (-10.0, 7.619853024160593e-24),
+    (-20.0, 2.7536241186063314e-89),
+])
+def test_reference_values(x, expected):
+    assert _norm_cdf(x) == pytest.approx(expected, rel=1e-12)
+
+
+def test_special_values_and_shape():
+    lower, upper = _norm_cdf_pair(np.array([[np.inf, -np.inf], [np.nan, -45.0]]))
+    assert lower.shape == (2, 2)
+    np.testing.assert_array_equal(lower, [[1.0, 0.0], [np.nan, 0.0]])
+    np.testing.assert_array_equal(upper, [[0.0, 1.0], [np.nan, 1.0]])
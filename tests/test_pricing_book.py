@@ -0,0 +1,104 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import bs_price
+from pricing_book import PricingBook, Tick
+
+
+def _book(n=3000, underlyings=30, seed=5):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"U{i}" for i in range(underlyings)])
+    underlying = names[rng.integers(0, underlyings, n)]
+    spots = {name: float(s) for name, s in zip(names, rng.uniform(50.0, 150.0, underlyings))}
+    contracts = dict(K=rng.uniform(50.0, 150.0, n), T=rng.uniform(0.05, 2.0, n), r=rng.uniform(0.0, 0.06, n),
+                     sigma=rng.uniform(0.1, 0.6, n), call=rng.random(n) < 0.5)
+    return underlying, contracts, spots
+
+
+# Reference prices in the constructor's order, from bs_price on the current
+# spot and volatility of every contract
+def _expected(underlying, contracts, spots, sigma):
+    S = np.array([spots[u] for u in underlying])
+    call, put = bs_price(S, contracts["K"], contracts["T"], contracts["r"], sigma)
+    return np.where(contracts["call"], call, put)
+
+
+def _prices(book, snapshot):
+    prices = np.empty_like(snapshot.prices)
+    prices[book.index] = snapshot.prices
+    return prices
+
+
+# One underlying, a few (index rows) and many (mask rows) per batch
+@pytest.mark.parametrize("touched", [1, 5, 20])
+def test_apply_matches_bs_price(touched):
+    underlying, contracts, spots = _book()
+    book = PricingBook(underlying, spots=spots, **contracts)
+    sigma = contracts["sigma"].copy()
+    np.testing.assert_allclose(_prices(book, book.snapshot), _expected(underlying, contracts, spots, sigma),
+                               rtol=1e-10, atol=1e-10)
+
+    rng = np.random.default_rng(touched)
+    names = sorted(spots)
+    for batch in range(3):
+        ticks = []
+        for name in rng.choice(names, touched, replace=False):
+            kind = rng.integers(0, 3)
+            spot = float(spots[name] * rng.uniform(0.9, 1.1)) if kind != 1 else None
+            vol = float(rng.uniform(0.1, 0.6)) if kind != 0 else None
+            ticks.append(Tick(name, spot, vol))
+            if spot is not None:
+                spots[name] = spot
+            if vol is not None:
+                sigma[underlying == name] = vol
+        ticks.append(Tick("UNKNOWN", 1.0, 0.5))  # ignored
+        snapshot = book.apply(ticks)
+        assert snapshot.version == batch + 1
+        np.testing.assert_allclose(_prices(book, snapshot), _expected(underlying, contracts, spots, sigma),
+                                   rtol=1e-10, atol=1e-10)
+        np.testing.assert_array_equal(snapshot.spots, [spots[u] for u in book.underlyings])
+
+
+def test_snapshots_are_read_only_and_kept():
+    underlying, contracts, spots = _book(n=100, underlyings=3)
+    book = PricingBook(underlying, spots=spots, **contracts)
+    before = book.snapshot
+    with pytest.raises(ValueError):
+        before.prices[0] = 0.0
+    book.apply([Tick("U0", spots["U0"] * 1.1)])
+    assert book.snapshot.version == before.version + 1
+    assert not np.array_equal(book.snapshot.prices, before.prices)
+    assert book.apply([Tick("UNKNOWN", 1.0)]) is book.snapshot
+
+
+def test_missing_spot_is_rejected():
+    underlying, contracts, spots = _book(n=100, underlyings=3)
+    del spots["U1"]
+    with pytest.raises(ValueError, match="U1"):
+        PricingBook(underlying, spots=spots, **contracts)
+
+
+# Ticks queued before run() gets to them are applied as one batch, and the
+# subscriber sees the final snapshot
+def test_run_batches_queued_ticks():
+    underlying, contracts, spots = _book(n=500, underlyings=5)
+    book = PricingBook(underlying, spots=spots, **contracts)
+
+    async def main():
+        queue = asyncio.Queue()
+        updates = book.subscribe()
+        for i in range(10):
+            queue.put_nowait(Tick(f"U{i % 5}", spots[f"U{i % 5}"] * (1.0 + i / 100.0)))
+        queue.put_nowait(None)
+        await book.run(queue)
+        await queue.join()
+        return await updates.get()
+
+    snapshot = asyncio.run(main())
+    assert snapshot.version == 1
+    for i in range(5, 10):
+        spots[f"U{i % 5}"] *= 1.0 + i / 100.0
+    np.testing.assert_allclose(_prices(book, snapshot), _expected(underlying, contracts, spots, contracts["sigma"]),
+                               rtol=1e-10, atol=1e-10)
@@ -0,0 +1,68 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from BlackScholesPricingModel import bs_price
+from scenarios import MIN_SIGMA, MIN_T, ScenarioGrid, scenario_pnl
+
+GRID = ScenarioGrid(spot=np.linspace(-0.2, 0.2, 5), vol=(-0.25, 0.0, 0.1), rate=(0.0, 0.01), days=(0, 30, 400))
+
+
+def _positions(n=40, seed=9):
+    rng = np.random.default_rng(seed)
+    names = np.array(["AAA", "BBB", "CCC"])
+    underlying = names[rng.integers(0, 3, n)]
+    spots = {"AAA": 100.0, "BBB": 55.0, "CCC": 230.0}
+    S = np.array([spots[u] for u in underlying])
+    return dict(S=S, K=S * rng.uniform(0.8, 1.2, n), T=rng.uniform(0.05, 1.5, n), r=0.03,
+                sigma=rng.uniform(0.1, 0.5, n), call=rng.random(n) < 0.5,
+                quantity=rng.choice([-3.0, -1.0, 1.0, 2.0], n), underlying=underlying)
+
+
+# Every position under every scenario, one bs_price call at a time
+def _brute_force(p):
+    n = len(p["S"])
+    pnl = np.empty((n,) + tuple(len(a) for a in GRID))
+    for i in range(n):
+        base = bs_price(p["S"][i], p["K"][i], p["T"][i], p["r"], p["sigma"][i])[0 if p["call"][i] else 1]
+        for idx in itertools.product(*(range(len(a)) for a in GRID)):
+            ds, dv, dr, days = (a[j] for a, j in zip(GRID, idx))
+            value = bs_price(p["S"][i] * (1.0 + ds), p["K"][i], max(p["T"][i] - days / 365.0, MIN_T),
+                             p["r"] + dr, max(p["sigma"][i] + dv, MIN_SIGMA))[0 if p["call"][i] else 1]
+            pnl[(i,) + idx] = (value - base) * p["quantity"][i]
+    return pnl
+
+
+# Block sizes: all positions in one block, ten rows per block, exactly one
+# row, and less than a row so each position is split across several
+# scenario slices
+@pytest.mark.parametrize("chunk_elements", [1 << 21, 900, 90, 7, 1])
+def test_matches_brute_force(chunk_elements):
+    p = _positions()
+    expected = _brute_force(p)
+    result = scenario_pnl(p["S"], p["K"], p["T"], p["r"], p["sigma"], GRID, call=p["call"],
+                          quantity=p["quantity"], underlying=p["underlying"], chunk_elements=chunk_elements,
+                          full=True)
+
+    assert result.grid_shape == expected.shape[1:]
+    np.testing.assert_allclose(result.pnl, expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(result.portfolio, expected.sum(axis=0), rtol=1e-9, atol=1e-8)
+    assert list(result.underlyings) == ["AAA", "BBB", "CCC"]
+    for k, name in enumerate(result.underlyings):
+        np.testing.assert_allclose(result.by_underlying[k], expected[p["underlying"] == name].sum(axis=0),
+                                   rtol=1e-9, atol=1e-8)
+
+    flat = expected.reshape(len(expected), -1)
+    np.testing.assert_allclose(result.worst, flat.min(axis=1), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(result.best, flat.max(axis=1), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(flat[np.arange(len(flat)), result.worst_scenario], flat.min(axis=1),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_aggregates_only_without_full():
+    p = _positions(n=5)
+    result = scenario_pnl(p["S"], p["K"], p["T"], p["r"], p["sigma"], GRID, call=p["call"], chunk_elements=7)
+    assert result.pnl is None
+    assert result.by_underlying.shape == (1,) + result.grid_shape
+    np.testing.assert_allclose(result.by_underlying[0], result.portfolio)
@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+import pytest
+
+from volatility import EWMAVolatility, GarchVolatility, RollingVolatility, VolatilityTracker, historical_volatility
+
+ESTIMATORS = [
+    lambda n=3: RollingVolatility(window=20, n=n),
+    lambda n=3: RollingVolatility(window=500, n=n),
+    lambda n=3: EWMAVolatility(n=n),
+    lambda n=3: GarchVolatility(n=n),
+]
+
+
+def _prices(days=60, n=3, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, (days, n)), axis=0))
+
+
+# Revising the newest price must leave the estimator exactly where feeding
+# the revised series from scratch would, including after later prices
+@pytest.mark.parametrize("factory", ESTIMATORS)
+def test_revise_matches_recomputation(factory):
+    prices = _prices()
+    revised = prices.copy()
+    revised[39] *= 1.1
+
+    estimator = factory()
+    estimator.update_many(prices[:40])
+    estimator.revise(revised[39])
+    estimator.revise(revised[39] * 1.0)  # revising twice is harmless
+    reference = factory()
+    reference.update_many(revised[:40])
+    np.testing.assert_allclose(estimator.sigma, reference.sigma, rtol=1e-10)
+
+    estimator.update_many(revised[40:])
+    reference.update_many(revised[40:])
+    np.testing.assert_allclose(estimator.sigma, reference.sigma, rtol=1e-10)
+
+
+# A missing price skips that series' return and leaves the other series
+# alone, as if the bar had not been in its history at all
+@pytest.mark.parametrize("factory", ESTIMATORS)
+def test_missing_prices_are_skipped_per_series(factory):
+    prices = _prices(days=400)
+    missing = {0: 0, 1: 10, 2: 399}  # column -> row: first, middle and last bar
+    gappy = prices.copy()
+    for col, row in missing.items():
+        gappy[row, col] = np.nan
+
+    def check(estimator, histories):
+        for col, history in enumerate(histories):
+            reference = factory(n=1)
+            reference.update_many(history)
+            np.testing.assert_allclose(estimator.sigma[col], reference.sigma[0], rtol=1e-10)
+
+    estimator = factory()
+    estimator.update_many(gappy)
+    histories = [np.delete(prices[:, col], row) for col, row in missing.items()]
+    check(estimator, histories)
+    np.testing.assert_array_equal(estimator.count, len(prices) - 2)
+
+    # A revised newest bar replaces the last price, or fills in a missing one
+    revised = prices[399] * 1.01
+    estimator.revise(revised)
+    check(estimator, [np.r_[h, r] if col == 2 else np.r_[h[:-1], r]
+                      for col, (h, r) in enumerate(zip(histories, revised))])
+
+
+def test_missing_price_matches_historical_volatility():
+    prices = _prices(days=400)
+    prices[10, 1] = np.nan
+    estimator = RollingVolatility(window=20, n=3)
+    np.testing.assert_allclose(estimator.update_many(prices), historical_volatility(prices, window=20), rtol=1e-10)
+
+
+def _series(prices):
+    import pandas as pd
+
+    return pd.Series(prices, index=pd.bdate_range("2024-01-01", periods=len(prices)))
+
+
+def test_tracker_picks_up_revised_last_close():
+    pytest.importorskip("pandas")
+    closes = _series(_prices(n=1)[:, 0])
+    tracker = VolatilityTracker(lambda: RollingVolatility(window=20))
+    tracker.update_series("X", closes[:40])
+
+    revised = closes.copy()
+    revised.iloc[39] *= 1.1
+    fresh = VolatilityTracker(lambda: RollingVolatility(window=20))
+    assert tracker.update_series("X", revised[:40]) == pytest.approx(fresh.update_series("X", revised[:40]), rel=1e-10)
+
+    # The revised close is also the base of the next bar's return
+    fresh = VolatilityTracker(lambda: RollingVolatility(window=20))
+    assert tracker.update_series("X", revised) == pytest.approx(fresh.update_series("X", revised), rel=1e-10)
+
+
+def test_tracker_concurrent_updates_feed_each_bar_once():
+    pytest.importorskip("pandas")
+    closes = _series(_prices(days=300, n=1)[:, 0])
+    tracker = VolatilityTracker(lambda: RollingVolatility(window=20))
+    barrier = threading.Barrier(8)
+
+    def work():
+        barrier.wait()
+        for end in range(50, 301, 10):
+            tracker.update_series("X", closes[:end])
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    reference = RollingVolatility(window=20)
+    reference.update_many(closes.to_numpy())
+    assert tracker.sigma("X") == pytest.approx(float(reference.sigma[0]), rel=1e-10)
+    assert tracker._estimators["X"].count[0] == len(closes) - 1
@@ -0,0 +1,246 @@
+# Incremental volatility estimators.
+#
+# Every estimator works on daily log returns and reports annualised
+# volatility (sqrt(252) scaling), so the CLI and the dashboard agree on the
+# definition. Estimators keep running state and update in O(1) per new
+# price, and each one tracks n series side by side: feed one price per
+# series to update(), or a (T, n) price matrix (oldest row first) to
+# update_many() to estimate volatility for a whole universe at once.
+# revise() replaces the most recent price instead (e.g. a revised intraday
+# close) and recomputes its return in place.
+
+import threading
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+class _Estimator:
+    def __init__(self, n=1):
+        self.n = n
+        self.count = np.zeros(n, dtype=np.intp)  # returns seen so far, per series
+        self._last_price = None
+        self._prev_price = None  # base of the newest return of each series
+        self._last_ok = np.zeros(n, dtype=bool)  # series the newest update added a return to
+
+    # Feed the next price of every series; returns the updated sigma. A
+    # non-finite price (a missing bar) adds no return for its series, and
+    # the series' previous price stays the base for its next return.
+    def update(self, prices):
+        prices = np.broadcast_to(np.asarray(prices, dtype=float), (self.n,))
+        if self._last_price is None:
+            self._last_price = prices.copy()
+            return self.sigma
+        x, ok = self._returns(prices, self._last_price)
+        if ok.any():
+            self._add_return(x, ok)
+            self.count += ok
+        self._prev_price = self._last_price
+        self._last_ok = ok
+        self._last_price = np.where(np.isfinite(prices), prices, self._last_price)
+        return self.sigma
+
+    # Replace the most recent price of every series; the return it ended is
+    # swapped for the revised one rather than added as a new observation. A
+    # series whose newest bar was missing gets the revised return added, and
+    # a non-finite revised price leaves its series unchanged.
+    def revise(self, prices):
+        if self._last_price is None:
+            return self.update(prices)
+        prices = np.broadcast_to(np.asarray(prices, dtype=float), (self.n,))
+        if self._prev_price is None:
+            self._last_price = np.where(np.isfinite(prices), prices, self._last_price)
+            return self.sigma
+        x, ok = self._returns(prices, self._prev_price)
+        replace = ok & self._last_ok
+        added = ok & ~self._last_ok
+        if replace.any():
+            self._replace_return(x, replace)
+        if added.any():
+            self._add_return(x, added)
+            self.count += added
+            self._last_ok = self._last_ok | added
+        self._last_price = np.where(ok, prices, self._last_price)
+        return self.sigma
+
+    @staticmethod
+    def _returns(prices, base):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.log(prices / base)
+        return x, np.isfinite(x)
+
+    # Undo the newest return of the series in ok and add x in its place.
+    # Recursive estimators save the state of each series before adding a
+    # return to it so it can be restored.
+    def _replace_return(self, x, ok):
+        self._restore(ok)
+        self.count -= ok
+        self._add_return(x, ok)
+        self.count += ok
+
+    def update_many(self, price_matrix):
+        price_matrix = np.asarray(price_matrix, dtype=float).reshape(-1, self.n)
+        for prices in price_matrix:
+            self.update(prices)
+        return self.sigma
+
+    @property
+    def sigma(self):
+        return np.sqrt(self.variance * TRADING_DAYS)
+
+
+# Sample standard deviation of the last window returns. The mean and sum of
+# squared deviations are updated in place as returns enter and leave a ring
+# buffer, so each update costs O(1) however long the window is. Series fill
+# their windows independently when some of them have missing bars.
+class RollingVolatility(_Estimator):
+    def __init__(self, window=TRADING_DAYS, n=1):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        super().__init__(n)
+        self.window = window
+        self._buffer = np.zeros((window, n))
+        self._mean = np.zeros(n)
+        self._m2 = np.zeros(n)
+
+    def _add_return(self, x, ok):
+        cols = np.flatnonzero(ok)
+        count, x = self.count[cols], x[cols]
+        slot = count % self.window
+        y = self._buffer[slot, cols]
+        mean, m2 = self._mean[cols], self._m2[cols]
+        # Welford update while the window fills, a slide once it is full
+        filling = count < self.window
+        new_mean = np.where(filling, mean + (x - mean) / (count + 1), mean + (x - y) / self.window)
+        new_m2 = np.where(filling, m2 + (x - mean) * (x - new_mean), m2 + (x - y) * (x - new_mean + y - mean))
+        self._mean[cols] = new_mean
+        self._m2[cols] = np.maximum(new_m2, 0.0)
+        self._buffer[slot, cols] = x
+
+    # Swap the newest return in the ring buffer, same update as a slide
+    def _replace_return(self, x, ok):
+        cols = np.flatnonzero(ok)
+        count, x = self.count[cols], x[cols]
+        slot = (count - 1) % self.window
+        y = self._buffer[slot, cols]
+        mean = self._mean[cols]
+        new_mean = mean + (x - y) / np.minimum(count, self.window)
+        self._mean[cols] = new_mean
+        self._m2[cols] = np.maximum(self._m2[cols] + (x - y) * (x - new_mean + y - mean), 0.0)
+        self._buffer[slot, cols] = x
+
+    @property
+    def variance(self):
+        size = np.minimum(self.count, self.window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(size >= 2, self._m2 / (size - 1), np.nan)
+
+
+# RiskMetrics-style exponentially weighted variance:
+# var_t = lam * var_{t-1} + (1 - lam) * r_t^2, seeded with the first squared return
+class EWMAVolatility(_Estimator):
+    def __init__(self, lam=0.94, n=1):
+        if not 0.0 < lam < 1.0:
+            raise ValueError("lam must be between 0 and 1")
+        super().__init__(n)
+        self.lam = lam
+        self._var = np.full(n, np.nan)
+        self._saved = np.full(n, np.nan)
+
+    def _add_return(self, x, ok):
+        self._saved[ok] = self._var[ok]
+        x_sq = x * x
+        var = np.where(self.count == 0, x_sq, self.lam * self._var + (1.0 - self.lam) * x_sq)
+        self._var = np.where(ok, var, self._var)
+
+    def _restore(self, ok):
+        self._var[ok] = self._saved[ok]
+
+    @property
+    def variance(self):
+        return self._var
+
+
+# GARCH(1,1) conditional variance:
+# var_{t+1} = omega + alpha * r_t^2 + beta * var_t, with omega set by
+# variance targeting, omega = (1 - alpha - beta) * long-run variance. The
+# long-run variance comes from long_run_vol (annualised) when given, or
+# otherwise from the running mean of squared returns.
+class GarchVolatility(_Estimator):
+    def __init__(self, alpha=0.08, beta=0.9, long_run_vol=None, n=1):
+        if alpha < 0 or beta < 0 or alpha + beta >= 1:
+            raise ValueError("GARCH(1,1) needs alpha, beta >= 0 and alpha + beta < 1")
+        super().__init__(n)
+        self.alpha = alpha
+        self.beta = beta
+        self.long_run_var = None if long_run_vol is None else long_run_vol ** 2 / TRADING_DAYS
+        self._mean_sq = np.zeros(n)
+        self._var = np.full(n, np.nan)
+        self._saved = (np.zeros(n), np.full(n, np.nan))
+
+    def _add_return(self, x, ok):
+        self._saved[0][ok] = self._mean_sq[ok]
+        self._saved[1][ok] = self._var[ok]
+        x_sq = x * x
+        mean_sq = self._mean_sq + (x_sq - self._mean_sq) / (self.count + 1)
+        target = mean_sq if self.long_run_var is None else self.long_run_var
+        omega = (1.0 - self.alpha - self.beta) * target
+        prev = np.where(self.count == 0, x_sq, self._var)
+        self._mean_sq = np.where(ok, mean_sq, self._mean_sq)
+        self._var = np.where(ok, omega + self.alpha * x_sq + self.beta * prev, self._var)
+
+    def _restore(self, ok):
+        self._mean_sq[ok] = self._saved[0][ok]
+        self._var[ok] = self._saved[1][ok]
+
+    @property
+    def variance(self):
+        return self._var
+
+
+# Per-symbol running state. update_series accepts the full (cached) close
+# series each time and feeds the estimator only the bars dated after the
+# last one it has seen, so refreshing sigma never rescans history. The
+# market data cache re-fetches the last bar to pick up intraday closes, so
+# a changed close on that bar revises the estimator's newest return. Calls
+# are serialised with a lock: the dashboard serves callbacks from several
+# threads, and feeding the same bars twice would corrupt the window.
+class VolatilityTracker:
+    def __init__(self, factory=RollingVolatility):
+        self.factory = factory
+        self._estimators = {}
+        self._last_seen = {}  # symbol -> (date, close) of the newest bar fed
+        self._lock = threading.Lock()
+
+    def update_series(self, symbol, closes):
+        with self._lock:
+            estimator = self._estimators.get(symbol)
+            if estimator is None:
+                estimator = self._estimators[symbol] = self.factory()
+            last_seen = self._last_seen.get(symbol)
+            if last_seen is not None:
+                last_date, last_close = last_seen
+                revised = closes[closes.index == last_date]
+                if len(revised) and revised.iloc[-1] != last_close:
+                    estimator.revise(revised.iloc[-1])
+                    self._last_seen[symbol] = (last_date, revised.iloc[-1])
+                closes = closes[closes.index > last_date]
+            if len(closes):
+                estimator.update_many(closes.to_numpy())
+                self._last_seen[symbol] = (closes.index[-1], closes.iloc[-1])
+            return float(estimator.sigma[0])
+
+    def sigma(self, symbol):
+        with self._lock:
+            return float(self._estimators[symbol].sigma[0])
+
+
+# Annualised volatility of each column of a (T, n) price matrix from the last
+# window log returns (all of them by default), in one vectorized pass
+def historical_volatility(prices, window=None):
+    prices = np.asarray(prices, dtype=float)
+    returns = np.diff(np.log(prices), axis=0)
+    if window is not None:
+        returns = returns[-window:]
+    return np.std(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)